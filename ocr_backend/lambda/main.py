@@ -1,322 +1,1488 @@
+# OCR 백엔드 서버의 핵심 기능을 구현한 메인 파일
+# FastAPI를 사용하여 RESTful API를 제공하며, AWS Lambda에서 실행됩니다.
+# 컨테이너 이미지(Dockerfile)와 CDK 배포가 모두 이 파일을 사용하며, 배포 환경별 차이는 환경 변수로 설정합니다.
+
 import os
-import io
-import json
-import traceback
-from datetime import datetime
-from typing import List, Optional
-from fastapi import FastAPI, UploadFile, File, HTTPException, BackgroundTasks
+import asyncio
+import httpx
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import FastAPI, UploadFile, File, Form, HTTPException, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from PIL import Image
+from fastapi.middleware.gzip import GZipMiddleware
+from openai import AsyncOpenAI
+from dotenv import load_dotenv
+from PIL import Image, UnidentifiedImageError
+import io
+import tempfile
+from typing import List, Dict, Any, Optional, Tuple, BinaryIO
+from collections import OrderedDict
+import hashlib
+import re
+from mangum import Mangum
 import pytesseract
-import boto3
-from botocore.exceptions import ClientError
-import openai
+import queue
+import socket
+from fastapi.responses import StreamingResponse, FileResponse, ORJSONResponse
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
-import gc
+from reportlab.lib.utils import ImageReader
+from io import BytesIO
+import boto3
+import uuid
+import time
+from datetime import datetime
+import sys
+import orjson
+import traceback
+from botocore.exceptions import ClientError, BotoCoreError
+from botocore.config import Config
+from boto3.s3.transfer import TransferConfig
 
-# 환경 변수 설정
-S3_BUCKET = os.getenv("S3_BUCKET", "ocr-temp-storage")
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+# Tesseract의 OpenMP 스레드를 1개로 제한 (코어가 적은 Lambda에서는 스레드 경합이 오히려 느림)
+# libtesseract가 로드되기 전에 설정해야 하며, pytesseract 서브프로세스에도 상속됨
+os.environ.setdefault('OMP_THREAD_LIMIT', '1')
 
-# S3 클라이언트 초기화
-s3_client = boto3.client('s3')
+try:
+    from tesserocr import PyTessBaseAPI
+except ImportError:
+    PyTessBaseAPI = None
+
+# SIMD base64 코덱 (설치되지 않은 환경에서는 표준 라이브러리 사용, API는 동일)
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
 
-# OpenAI 클라이언트 초기화
-openai.api_key = OPENAI_API_KEY
-openai.api_base = "https://api.openai.com/v1"
-openai.http_client = None  # 프록시 오류 방지
+# 환경 변수 로드 (.env 파일에서 API 키 등을 가져옴)
+load_dotenv()
 
-# Tesseract OCR 경로 설정 (Lambda 환경)
-pytesseract.pytesseract.tesseract_cmd = '/usr/bin/tesseract'
+# FastAPI 애플리케이션 초기화
+app = FastAPI(default_response_class=ORJSONResponse)  # orjson으로 응답 직렬화
+# AWS Lambda에서 FastAPI를 실행하기 위한 핸들러 (SQS 이벤트는 아래 handler에서 따로 처리)
+# (lifespan 이벤트를 사용하지 않으므로 호출마다 startup/shutdown 사이클을 돌지 않도록 비활성화)
+asgi_handler = Mangum(app, lifespan="off")
 
-app = FastAPI()
+# 업로드 크기 제한
+MAX_FILE_SIZE = 10 * 1024 * 1024
+# 여러 파일을 한 번에 올릴 수 있으므로 요청 전체 크기는 별도로 제한
+MAX_REQUEST_SIZE = int(os.getenv("MAX_REQUEST_SIZE", 5 * MAX_FILE_SIZE))
+UPLOAD_CHUNK_SIZE = 64 * 1024
 
-# CORS 설정
+# 요청 본문을 읽기 전에 Content-Length로 크기 제한 확인
+# (@app.middleware("http")는 요청마다 BaseHTTPMiddleware의 태스크와 응답 스트림 래핑 비용이 들므로 순수 ASGI 미들웨어로 구현)
+# (CORS 헤더가 413 응답에도 붙도록 CORSMiddleware보다 먼저 등록)
+class RequestSizeLimitMiddleware:
+    def __init__(self, app):
+        self.app = app
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            for name, value in scope["headers"]:
+                if name == b"content-length":
+                    if value.isdigit() and int(value) > MAX_REQUEST_SIZE:
+                        response = ORJSONResponse(status_code=413, content={"detail": "요청 크기가 너무 큽니다."})
+                        await response(scope, receive, send)
+                        return
+                    break
+        await self.app(scope, receive, send)
+
+app.add_middleware(RequestSizeLimitMiddleware)
+
+# CORS 설정: 프론트엔드 도메인에서의 접근을 허용 (쉼표로 구분한 ALLOWED_ORIGINS 환경 변수로 변경 가능)
+ALLOWED_ORIGINS = os.getenv("ALLOWED_ORIGINS", "https://main.d32popiutux8lz.amplifyapp.com").split(",")
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=ALLOWED_ORIGINS,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["*"],
+    max_age=86400
+)
+
+# 응답 압축: 긴 한국어 OCR 텍스트가 담긴 JSON 응답을 gzip으로 전송
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
+# Tesseract OCR 엔진 경로 설정 (컨테이너 이미지는 /usr/bin, 레이어를 쓰는 경우 TESSERACT_CMD로 지정)
+pytesseract.pytesseract.tesseract_cmd = os.getenv("TESSERACT_CMD", "/usr/bin/tesseract")
+
+# OCR/요약과 같은 블로킹 작업을 이벤트 루프 밖에서 실행하기 위한 스레드 풀
+executor = ThreadPoolExecutor(max_workers=os.cpu_count())
+
+# Tesseract 엔진 풀: tesserocr가 설치된 경우 언어 모델을 컨테이너당 한 번만 로드하고 재사용
+# (tesserocr가 없으면 pytesseract 서브프로세스 방식으로 동작)
+OCR_LANG = 'kor+eng'
+OCR_PSM = 6  # 단일 텍스트 블록으로 처리 (기본값 3의 자동 페이지 분할보다 빠름)
+TESS_POOL_SIZE = os.cpu_count() or 1
+tess_pool = queue.Queue(maxsize=TESS_POOL_SIZE)
+
+# Tesseract API 인스턴스 생성 함수
+def create_tess_api():
+    tessdata_path = os.getenv("TESSDATA_PREFIX")
+    if tessdata_path:
+        return PyTessBaseAPI(path=tessdata_path, lang=OCR_LANG, psm=OCR_PSM)
+    return PyTessBaseAPI(lang=OCR_LANG, psm=OCR_PSM)
+
+if PyTessBaseAPI is not None:
+    for _ in range(TESS_POOL_SIZE):
+        tess_pool.put(create_tess_api())
+
+# 풀에서 Tesseract 인스턴스를 빌려 OCR 실행
+def run_tesseract(image: Image.Image) -> str:
+    if PyTessBaseAPI is None:
+        # pytesseract는 이미지마다 PNG 임시 파일을 쓰고 tesseract를 실행하므로,
+        # 이진화된 이미지는 1비트로 넘겨 임시 파일의 인코딩/디코딩 양을 1/8로 줄임
+        if image.mode == 'L' and OCR_PREPROCESS == "binary":
+            image = image.convert('1', dither=Image.Dither.NONE)
+        return pytesseract.image_to_string(image, lang=OCR_LANG, config=f'--psm {OCR_PSM}')
+    
+    # SetImage(PIL)는 이미지를 파일 형식으로 인코딩한 뒤 Leptonica가 다시 디코딩하므로, 8비트 흑백 픽셀 버퍼를 그대로 전달
+    if image.mode != 'L':
+        image = image.convert('L')
+    width, height = image.size
+    
+    api = tess_pool.get()
+    try:
+        api.SetImageBytes(image.tobytes(), width, height, 1, width)
+        return api.GetUTF8Text()
+    finally:
+        api.Clear()  # 인식 결과와 페이지 메모리를 바로 해제
+        tess_pool.put(api)
+
+# OpenAI 전용 HTTP 클라이언트: 웜 컨테이너에서 연결을 유지하고, HTTP/2로 동시 요약 요청을 하나의 TLS 연결에 다중화
+# (SDK 기본 클라이언트를 만들지 않으므로 httpx 버전에 따른 proxies 인자 오류도 발생하지 않음)
+# httpx 기본 유휴 연결 유지 시간(5초)은 호출 간격보다 짧아 매번 TLS 핸드셰이크를 다시 하므로 60초로 늘림
+# (서버가 먼저 끊은 연결은 httpx가 재사용 전에 감지하고 새로 연결)
+# (종료 훅으로 닫지 않음: Lambda는 lifespan을 끄고 컨테이너를 동결/종료할 때 연결도 함께 정리되며, 로컬 uvicorn은 프로세스 종료로 정리됨)
+openai_http_client = httpx.AsyncClient(
+    http2=True,
+    timeout=30.0,
+    limits=httpx.Limits(max_keepalive_connections=16, max_connections=32, keepalive_expiry=60.0)
+)
+
+# OpenAI API 클라이언트 초기화 (비동기 클라이언트를 웜 컨테이너에서 재사용)
+openai_client = AsyncOpenAI(
+    api_key=os.getenv("OPENAI_API_KEY"),
+    max_retries=3,  # 동시 요청 시 429/5xx 응답은 SDK가 지수 백오프로 재시도
+    timeout=30.0,
+    http_client=openai_http_client
 )
 
 # 로깅 헬퍼 함수
-def log_info(message: str, **kwargs):
-    log_data = {
-        "timestamp": datetime.utcnow().isoformat(),
-        "level": "INFO",
-        "message": message,
-        **kwargs
-    }
-    print(json.dumps(log_data))
+# LOG_LEVEL 환경 변수로 출력 수준 조절 (DEBUG: 단계별 상세 로그 포함, WARNING/ERROR: 오류만 출력)
+# 한국어 문자열을 이스케이프하지 않고 orjson으로 한 번에 직렬화
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_DEBUG_ENABLED = LOG_LEVEL == "DEBUG"
+LOG_INFO_ENABLED = LOG_LEVEL in ("DEBUG", "INFO")
 
-def log_error(message: str, error: Exception = None, **kwargs):
+def write_log(level: str, message: str, kwargs: dict):
     log_data = {
         "timestamp": datetime.utcnow().isoformat(),
-        "level": "ERROR",
+        "level": level,
         "message": message,
         **kwargs
     }
+    print(orjson.dumps(log_data, default=str).decode())
+
+def log_debug(message: str, **kwargs):
+    if LOG_DEBUG_ENABLED:
+        write_log("DEBUG", message, kwargs)
+
+def log_info(message: str, **kwargs):
+    if LOG_INFO_ENABLED:
+        write_log("INFO", message, kwargs)
+
+# exc_info=False: 예상된 오류(캐시 미스, 다운로드 실패 등)는 스택 트레이스 문자열을 만들지 않음
+def log_error(message: str, error: Exception = None, exc_info: bool = True, **kwargs):
     if error:
-        log_data["error"] = str(error)
-        log_data["traceback"] = traceback.format_exc()
-    print(json.dumps(log_data))
+        kwargs["error_type"] = type(error).__name__
+        kwargs["error_message"] = str(error)
+        if exc_info and sys.exc_info()[0] is not None:
+            kwargs["stacktrace"] = traceback.format_exc()
+    write_log("ERROR", message, kwargs)
+
+# 한글 폰트 등록 (컨테이너당 한 번만 TTF 파싱, 폰트가 없으면 PDF 생성만 실패하도록 오류만 기록)
+FONT_PATH = os.getenv("FONT_PATH", "/var/task/fonts/NanumGothic.ttf")
+try:
+    if 'NanumGothic' not in pdfmetrics.getRegisteredFontNames():
+        pdfmetrics.registerFont(TTFont('NanumGothic', FONT_PATH))
+except Exception as e:
+    log_error("한글 폰트 등록 실패", e, font_path=FONT_PATH)
+
+# 요약 시스템 프롬프트
+# OpenAI 자동 프롬프트 캐싱은 1024 토큰 이상의 동일한 접두부에서만 동작하므로,
+# 변하지 않는 지침과 예시를 모두 시스템 메시지에 두고 OCR 텍스트는 마지막 사용자 메시지로만 전달함
+KOREAN_SUMMARY_SYSTEM = """당신은 OCR(광학 문자 인식)로 추출된 문서를 요약하는 한국어 요약 도우미입니다.
+사용자 메시지에는 스캔 이미지나 사진에서 Tesseract로 추출한 원문 텍스트만 전달됩니다.
+아래 지침과 출력 형식을 항상 동일하게 따르세요.
+
+[요약 지침]
+1. 요약은 반드시 한국어로 작성합니다. 원문이 영어이거나 한국어와 영어가 섞여 있어도 한국어로 요약합니다.
+2. 문서의 핵심 주제, 주요 사실, 결론 또는 요청 사항을 우선적으로 포함합니다.
+3. 날짜, 금액, 수량, 기관명, 인명, 제품명 등 고유한 정보는 원문 표기를 그대로 유지합니다.
+4. OCR 과정에서 생긴 오타, 깨진 글자, 불필요한 줄바꿈, 반복된 기호는 문맥에 맞게 무시하거나 자연스럽게 보정합니다.
+5. 원문에 없는 내용을 추측하거나 덧붙이지 않습니다. 확실하지 않은 정보는 생략합니다.
+6. 인사말, 서명, 머리글/바닥글, 페이지 번호, 광고 문구처럼 핵심과 무관한 내용은 제외합니다.
+7. 표나 목록 형태의 원문은 항목 사이의 관계가 드러나도록 문장으로 정리합니다.
+8. 문체는 "~입니다/~합니다" 대신 간결한 평서문("~이다", "~함")을 사용합니다.
+9. 원문이 너무 짧거나 의미 있는 문장이 거의 없으면 "요약할 내용이 충분하지 않음"이라고만 답합니다.
+10. 개인정보(주민등록번호, 전화번호, 계좌번호 등)는 요약에 옮기지 않습니다.
+11. 여러 주제가 섞인 문서는 가장 비중이 큰 주제를 먼저 쓰고, 나머지는 중요한 순서대로 짧게 덧붙입니다.
+12. 숫자와 단위는 원문 표기를 따르되, OCR로 쉼표나 소수점이 깨진 경우 앞뒤 문맥(합계, 단가 등)으로 확인되는 경우에만 바로잡습니다.
+13. 날짜는 원문에 연도가 있으면 연도를 포함하고, 요일이나 시간은 일정과 관련된 경우에만 남깁니다.
+14. 양식, 신청서, 증명서처럼 항목명과 값이 나열된 문서는 문서 종류를 먼저 밝히고 핵심 항목의 값만 정리합니다.
+15. 손글씨나 저화질 사진에서 추출되어 문장이 대부분 깨진 경우에도 알아볼 수 있는 단어로 확인되는 사실만 요약합니다.
+16. 원문의 어조(공지, 요청, 경고, 안내 등)가 드러나도록 "~하기로 함", "~해야 함", "~할 수 있음"과 같이 끝맺습니다.
+
+[출력 형식]
+- 머리말이나 "요약:" 같은 접두어 없이 요약 본문만 출력합니다.
+- 마크다운, 글머리 기호, 따옴표를 사용하지 않습니다.
+- 한 문단으로 작성합니다.
+- 3문장 이내로 한글로 요약.
+
+[예시 1]
+원문:
+2024년 3월 15일
+공지사항
+사내 보안 점검으로 인해 3월 20일(수) 오후 6시부터 오후 10시까지 그룹웨어 접속이 제한됩니다.
+점검 시간 동안 메일 발송이 지연될 수 있으니 업무에 참고하시기 바랍니다.
+문의: 정보보안팀 (내선 1234)
+요약:
+보안 점검으로 3월 20일 오후 6시부터 10시까지 그룹웨어 접속이 제한되며 이 시간 동안 메일 발송이 지연될 수 있음.
+
+[예시 2]
+원문:
+영 수 증
+상호: 행복마트 강남점
+2024-05-02 14:31
+우유 1L 2개 5,400
+식빵 1개 3,200
+계란 10구 1개 4,980
+합계 13,580
+카드결제 13,580
+요약:
+2024년 5월 2일 행복마트 강남점에서 우유, 식빵, 계란을 구매하고 총 13,580원을 카드로 결제한 영수증임.
+
+[예시 3]
+원문:
+Meeting Minutes - Product Team
+Date: June 7, 2024
+- Beta release moved to July 1 due to payment module bugs.
+- QA to add regression tests for checkout flow.
+- Marketing launch plan review next Friday.
+요약:
+제품팀 회의에서 결제 모듈 버그로 베타 출시일을 7월 1일로 연기하고, QA가 결제 흐름 회귀 테스트를 추가하며, 다음 주 금요일에 마케팅 출시 계획을 검토하기로 함.
+
+[예시 4]
+원문:
+제 3 조 (계약 기간)
+본 계약의 기간은 2024년 1월 1일부터 2025년 12월 31일까지로 한다.
+단, 계약 만료 1개월 전까지 어느 일방의 서면 해지 통보가 없는 경우 동일 조건으로 1년간 자동 연장된다.
+요약:
+계약 기간은 2024년 1월 1일부터 2025년 12월 31일까지이며, 만료 1개월 전까지 서면 해지 통보가 없으면 같은 조건으로 1년 자동 연장됨.
+
+[예시 5]
+원문:
+재 직 증 명 서
+성 명 : 홍길동
+소 속 : 개발본부 플랫폼팀
+직 위 : 선임연구원
+재직기간 : 2019. 03. 04 ~ 현재
+용 도 : 금융기관 제출용
+위 사실을 증명합니다.
+2024년 8월 12일
+주식회사 한빛소프트 대표이사 (인)
+요약:
+주식회사 한빛소프트가 발급한 재직증명서로, 홍길동이 개발본부 플랫폼팀 선임연구원으로 2019년 3월 4일부터 현재까지 재직 중임을 금융기관 제출용으로 증명함.
+
+[예시 6]
+원문:
+|품목 |수량|단가 |금액 |
+|A4 용지|10 |4,500 |45,000 |
+|토너 |2 |38,000 |76,000 |
+|볼펜 |30 |500 |15,000 |
+공급가액 136,000 부가세 13,600
+총 액 149,600
+요약:
+A4 용지 10개, 토너 2개, 볼펜 30개의 견적으로 공급가액 136,000원에 부가세 13,600원을 더해 총 149,600원임.
+
+[예시 7]
+원문:
+~~ 회 의 메 모 ~~
+다음주 화욜 ㅊ시 본사 ㄱ의실
+신제품 가격 논의 -> 1만2천원 vs 1만5천원
+결정x 재무팀 의견 받기
+요약:
+다음 주 화요일 본사 회의실에서 신제품 가격(1만 2천 원 또는 1만 5천 원)을 논의하며, 아직 결정하지 않고 재무팀 의견을 받기로 함.
+
+[예시 8]
+원문:
+ㅡ 1 ㅡ
+.. ' , ;
+요약:
+요약할 내용이 충분하지 않음
+"""
+
+# 요약 모델 라우팅 설정
+# 길고 밀도 높은 텍스트는 SUMMARY_MODEL, 짧거나 단순한 텍스트는 SUMMARY_MODEL_SMALL,
+# 아주 짧은 텍스트는 네트워크 호출 없이 로컬에서 정리만 수행
+# (기본 모델은 위의 긴 시스템 프롬프트가 자동 프롬프트 캐싱되는 gpt-4o/gpt-4o-mini, gpt-3.5-turbo는 캐싱 대상이 아님)
+SUMMARY_MODEL = os.getenv("SUMMARY_MODEL", "gpt-4o")
+SUMMARY_MODEL_SMALL = os.getenv("SUMMARY_MODEL_SMALL", "gpt-4o-mini")
+SUMMARY_MAX_TOKENS = 120
+SMALL_SUMMARY_MAX_TOKENS = 80
+SUMMARY_TEMPERATURE = 0  # 같은 입력에 같은 요약이 나오도록 고정 (요약 캐시와 일관성 유지)
+LOCAL_SUMMARY_MAX_CHARS = 40  # 공백을 제외한 글자 수 (한국어는 어절 수가 적어 단어 수 기준으로는 짧은 문서 대부분이 걸림)
+SMALL_SUMMARY_MAX_WORDS = 200
+MIN_TEXT_DENSITY = 0.5
+TEXT_CHAR_PATTERN = re.compile(r"[가-힣A-Za-z0-9]")
+
+# 텍스트 길이와 문자 밀도로 요약 방식을 결정하는 함수
+# 반환값: (provider, model, max_tokens)
+def route_model(extracted_text: str) -> Tuple[str, Optional[str], Optional[int]]:
+    words = extracted_text.split()
+    if sum(len(word) for word in words) < LOCAL_SUMMARY_MAX_CHARS:
+        return "local", None, None
+    word_count = len(words)
+    
+    # 글자 대비 기호/공백 비율이 높으면 표나 깨진 OCR 결과로 보고 작은 모델 사용
+    density = len(TEXT_CHAR_PATTERN.findall(extracted_text)) / len(extracted_text)
+    if word_count < SMALL_SUMMARY_MAX_WORDS or density < MIN_TEXT_DENSITY:
+        return "openai", SUMMARY_MODEL_SMALL, SMALL_SUMMARY_MAX_TOKENS
+    
+    return "openai", SUMMARY_MODEL, SUMMARY_MAX_TOKENS
+
+# 로컬 요약: 요약할 내용이 없을 만큼 짧은 텍스트(제목 한 줄 등)는 공백만 정리해 그대로 사용
+def summarize_locally(extracted_text: str) -> str:
+    return " ".join(extracted_text.split())
+
+# LRU 캐시 조회 함수
+def lru_get(cache: OrderedDict, key: str) -> Optional[str]:
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+# LRU 캐시 저장 함수 (최대 max_size개 유지)
+def lru_set(cache: OrderedDict, key: str, value: str, max_size: int):
+    cache[key] = value
+    cache.move_to_end(key)
+    if len(cache) > max_size:
+        cache.popitem(last=False)
+
+# OCR 캐시 설정: 동일한 이미지 바이트는 Tesseract를 다시 실행하지 않음
+# 1단계: 프로세스 내 LRU, 2단계: S3 버킷의 ocr-cache/ 접두사 (Lambda 컨테이너 간 공유)
+OCR_CACHE_SIZE = 256
+OCR_CACHE_PREFIX = "ocr-cache/"
+ocr_cache = OrderedDict()
+ocr_in_flight: Dict[str, asyncio.Task] = {}  # 캐시 키별로 진행 중인 OCR 작업
+
+# OCR 캐시 키 생성 함수 (업로드를 읽으면서 계산한 BLAKE2b 128비트 해시 사용)
+# (전처리 설정이 바뀌면 OCR 결과도 달라지므로 키에 포함)
+def ocr_cache_key(content_hash: str) -> str:
+    return f"{OCR_LANG}-psm{OCR_PSM}-{OCR_PREPROCESS}{OCR_MAX_EDGE}/{content_hash}"
+
+# 요약 캐시 설정: 동일한 (모델, 시스템 프롬프트, 텍스트)는 OpenAI를 다시 호출하지 않음
+SUMMARY_CACHE_SIZE = 1024
+SUMMARY_CACHE_PREFIX = "summary-cache/"
+summary_cache = OrderedDict()
+
+# 요약 캐시 키 생성 함수
+# (OCR 결과는 같은 문서라도 공백/줄바꿈이 조금씩 달라지므로 공백을 정규화한 텍스트로 키 생성)
+# (임베딩 유사도 캐시는 미스마다 임베딩 API 왕복과 벡터 저장소가 필요하므로 사용하지 않고, 정규화한 텍스트의 정확한 일치만 재사용)
+def summary_cache_key(model: str, extracted_text: str) -> str:
+    raw = "\0".join([model, KOREAN_SUMMARY_SYSTEM, " ".join(extracted_text.split())])
+    return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
+
+
+# S3 클라이언트 설정: 웜 컨테이너에서 커넥션 재사용, 적응형 재시도
+s3_config = Config(
+    max_pool_connections=50,
+    tcp_keepalive=True,
+    retries={'mode': 'adaptive'}
+)
+
+# 5MB 이상 업로드는 멀티파트로 나눠 병렬 전송
+s3_transfer_config = TransferConfig(
+    multipart_threshold=5 * 1024 * 1024,
+    max_concurrency=8,
+    use_threads=True
+)
+
+# S3 클라이언트 초기화
+log_info("S3 클라이언트 초기화")
+s3_client = boto3.client('s3', config=s3_config)
+S3_BUCKET = os.getenv('S3_BUCKET')
+log_info(f"S3 버킷 설정", bucket=S3_BUCKET)
+
+# 비동기 요약 작업 큐 (설정되지 않은 로컬 개발 환경에서는 BackgroundTasks로 처리)
+sqs_client = boto3.client('sqs')
+SUMMARY_QUEUE_URL = os.getenv('SUMMARY_QUEUE_URL')
+
+# 프리사인드 URL 유효 기간 (초)
+PRESIGNED_URL_EXPIRY = 86400
+
+# GetObject 프리사인드 URL 생성 함수
+# (클라이언트에 캐시된 자격 증명으로 로컬 서명만 하므로 네트워크 호출 없음, 서명기와 엔드포인트 규칙은 워밍업에서 미리 로드)
+def presign_get_url(key: str) -> str:
+    return s3_client.generate_presigned_url(
+        'get_object',
+        Params={'Bucket': S3_BUCKET, 'Key': key},
+        ExpiresIn=PRESIGNED_URL_EXPIRY
+    )
+
+# 확장자별 Content-Type (".jpg"를 비표준 "image/jpg"로 저장하지 않도록 명시)
+EXT_TO_MIME = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.bmp': 'image/bmp',
+    '.gif': 'image/gif',
+    '.tif': 'image/tiff',
+    '.tiff': 'image/tiff',
+    '.webp': 'image/webp',
+}
+
+# close()만 무시하는 파일 래퍼
+# (upload_fileobj는 업로드가 끝나면 전달받은 파일을 닫으므로, 업로드 후에도 inline 응답 등에서 다시 읽을 수 있도록 감싸서 전달)
+class NonClosingFile:
+    def __init__(self, file_obj: BinaryIO):
+        self._file_obj = file_obj
+    
+    def __getattr__(self, name):
+        return getattr(self._file_obj, name)
+    
+    def close(self):
+        pass
+
+# S3에 파일 업로드 함수 (Content-Type은 키의 확장자로 결정)
+async def upload_to_s3(file_obj: BinaryIO, unique_filename: str) -> str:
+    try:
+        ext = os.path.splitext(unique_filename)[1]
+        log_debug(
+            f"S3 업로드 시작",
+            unique_filename=unique_filename,
+            bucket=S3_BUCKET
+        )
+        
+        # S3에 업로드 (큰 파일은 멀티파트 병렬 업로드, 블로킹 호출이므로 스레드에서 실행)
+        await asyncio.to_thread(
+            s3_client.upload_fileobj,
+            NonClosingFile(file_obj),
+            S3_BUCKET,
+            unique_filename,
+            ExtraArgs={'ContentType': EXT_TO_MIME.get(ext, 'application/octet-stream')},
+            Config=s3_transfer_config
+        )
+        log_info("S3 업로드 완료", filename=unique_filename)
+        
+        # 24시간 유효한 프리사인드 URL 생성
+        url = presign_get_url(unique_filename)
+        
+        return url
+    except Exception as e:
+        log_error("S3 업로드 실패", e, filename=unique_filename, bucket=S3_BUCKET)
+        raise e
+
+# 업로드 이미지 최대 크기 (A4 크기 기준, 300dpi)
+PREVIEW_MAX_SIZE = (2480, 3508)
 
 # 이미지 전처리 함수
 def preprocess_image(image: Image.Image) -> Image.Image:
     try:
-        # 이미지 크기 최적화 (A4 크기 기준, 300dpi)
-        max_size = (2480, 3508)
-        if image.size[0] > max_size[0] or image.size[1] > max_size[1]:
-            original_size = image.size
-            image.thumbnail(max_size, Image.Resampling.LANCZOS)
-            log_info("이미지 크기 조정", {
-                "original_size": original_size,
-                "new_size": image.size,
-                "max_size": max_size
-            })
+        width, height = image.size
+        mode = image.mode
+        
+        # 이미지 크기 최적화
+        if width > PREVIEW_MAX_SIZE[0] or height > PREVIEW_MAX_SIZE[1]:
+            # 업로드 미리보기용 축소이므로 LANCZOS 대신 빠른 BILINEAR 사용 (OCR 입력은 별도로 축소)
+            image.thumbnail(PREVIEW_MAX_SIZE, Image.Resampling.BILINEAR, reducing_gap=2.0)
+            log_debug("이미지 크기 조정", original_size=(width, height), new_size=image.size, max_size=PREVIEW_MAX_SIZE)
         
         # 이미지를 RGB로 변환
-        if image.mode not in ('L', 'RGB'):
-            original_mode = image.mode
+        if mode not in ('L', 'RGB'):
             image = image.convert('RGB')
-            log_info("이미지 모드 변환", {
-                "original_mode": original_mode,
-                "new_mode": image.mode
-            })
+            log_debug("이미지 모드 변환", original_mode=mode, new_mode='RGB')
         
         return image
     except Exception as e:
         log_error("이미지 전처리 중 오류 발생", e)
         raise e
 
+# OCR 입력 최대 크기 (긴 변 기준, 기본값은 약 300dpi 문서에 해당, Tesseract 처리 시간은 픽셀 수에 비례)
+OCR_MAX_EDGE = int(os.getenv("OCR_MAX_EDGE", 1800))
+OCR_MAX_SIZE = (OCR_MAX_EDGE, OCR_MAX_EDGE)
+# OCR 전처리 방식: binary(Otsu 이진화, 기본값) 또는 gray(그레이스케일만, 이진화로 글자가 뭉개지는 스캔용)
+OCR_PREPROCESS = os.getenv("OCR_PREPROCESS", "binary")
+
+# Otsu 방식으로 이진화 임계값 계산 (256단계 히스토그램 기반)
+def otsu_threshold(histogram: List[int]) -> int:
+    total = sum(histogram)
+    sum_all = sum(i * count for i, count in enumerate(histogram))
+    sum_background = 0
+    weight_background = 0
+    best_variance = 0
+    threshold = 0
+    for i, count in enumerate(histogram):
+        weight_background += count
+        if weight_background == 0:
+            continue
+        weight_foreground = total - weight_background
+        if weight_foreground == 0:
+            break
+        sum_background += i * count
+        mean_background = sum_background / weight_background
+        mean_foreground = (sum_all - sum_background) / weight_foreground
+        variance = weight_background * weight_foreground * (mean_background - mean_foreground) ** 2
+        if variance > best_variance:
+            best_variance = variance
+            threshold = i
+    return threshold
+
+# OCR 전용 전처리 함수: 그레이스케일 변환, 축소, Otsu 이진화
+def preprocess_for_ocr(image: Image.Image) -> Image.Image:
+    ocr_image = image.convert('L')  # 원본은 S3 업로드용으로 유지, 흑백 1채널로 변환 후 축소
+    width, height = ocr_image.size
+    if width > OCR_MAX_SIZE[0] or height > OCR_MAX_SIZE[1]:
+        ocr_image.thumbnail(OCR_MAX_SIZE, Image.Resampling.BILINEAR)
+    
+    if OCR_PREPROCESS == "gray":
+        return ocr_image
+    
+    threshold = otsu_threshold(ocr_image.histogram())
+    return ocr_image.point([0] * (threshold + 1) + [255] * (255 - threshold))
+
 # OCR 수행 함수
 def perform_ocr(image: Image.Image) -> str:
     try:
-        log_info("Tesseract OCR 시작")
-        extracted_text = pytesseract.image_to_string(image, lang='kor+eng')
-        log_info("OCR 완료", {"text_length": len(extracted_text)})
-        
-        # OpenAI로 요약 생성
-        log_info("OpenAI API 호출 시작")
-        summary_response = openai.ChatCompletion.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "한국어 텍스트를 간단히 요약해주세요."},
-                {"role": "user", "content": extracted_text}
-            ]
-        )
-        summary = summary_response.choices[0].message.content
-        log_info("요약 완료", {"summary_length": len(summary)})
-        
-        return {
-            "text": extracted_text,
-            "summary": summary
-        }
+        ocr_image = preprocess_for_ocr(image)
+        log_debug("Tesseract OCR 시작", size=ocr_image.size)
+        extracted_text = run_tesseract(ocr_image)
+        log_info("OCR 완료", text_length=len(extracted_text))
+        return extracted_text
     except Exception as e:
         log_error("OCR 처리 실패", e)
         raise e
 
-# S3에 이미지 업로드
-def upload_to_s3(file: UploadFile, filename: str) -> str:
+# S3 텍스트 캐시 조회 함수 (웜 컨테이너가 바뀌어도 재사용할 수 있도록 버킷에 저장된 OCR/요약 결과 확인)
+# (연결 실패 등 S3 오류는 캐시 미스로 처리해 OCR/요약 자체는 실패하지 않도록 함)
+def read_text_cache_from_s3(prefix: str, cache_key: str) -> Optional[str]:
     try:
-        # 이미지 데이터 읽기
-        image_data = file.file.read()
-        
-        # S3에 업로드
-        s3_client.put_object(
-            Bucket=S3_BUCKET,
-            Key=filename,
-            Body=image_data,
-            ContentType=file.content_type
-        )
-        
-        # 프리사인드 URL 생성
-        url = s3_client.generate_presigned_url(
-            'get_object',
-            Params={
-                'Bucket': S3_BUCKET,
-                'Key': filename
-            },
-            ExpiresIn=3600
-        )
-        
-        return url
+        response = s3_client.get_object(Bucket=S3_BUCKET, Key=f"{prefix}{cache_key}.txt")
+        return response['Body'].read().decode('utf-8')
     except ClientError as e:
-        log_error("S3 업로드 중 오류 발생", e)
-        raise HTTPException(status_code=500, detail="이미지 업로드 중 오류가 발생했습니다.")
-    finally:
-        # 메모리 정리
-        del image_data
-        gc.collect()
+        if e.response["Error"]["Code"] != "NoSuchKey":
+            log_error("S3 캐시 조회 실패", e, cache_key=f"{prefix}{cache_key}", exc_info=False)
+        return None
+    except BotoCoreError as e:
+        log_error("S3 캐시 조회 실패", e, cache_key=f"{prefix}{cache_key}", exc_info=False)
+        return None
+
+# S3 텍스트 캐시 저장 함수 (버킷 수명 주기 규칙에 따라 1일 후 자동 삭제)
+# (실패는 호출한 쪽에서 처리: 백그라운드 저장은 로그만 남기고, 요약 워커는 메시지를 다시 시도)
+def write_text_cache_to_s3(prefix: str, cache_key: str, text: str):
+    s3_client.put_object(
+        Bucket=S3_BUCKET,
+        Key=f"{prefix}{cache_key}.txt",
+        Body=text.encode('utf-8'),
+        ContentType="text/plain; charset=utf-8"
+    )
+
+# 응답이 S3 저장을 기다리지 않도록 캐시 저장은 백그라운드 태스크로 실행
+# (이벤트 루프는 태스크를 약하게만 참조하므로 끝날 때까지 집합에 보관하고, 실패는 로그만 남김)
+# (Lambda에서는 응답 후 컨테이너가 멈추면 같은 이벤트 루프에서 다음 호출 때 이어서 실행되며, 컨테이너가 종료되면 캐시 저장만 누락됨)
+cache_write_tasks = set()
+
+def store_text_cache_in_background(prefix: str, cache_key: str, text: str):
+    task = asyncio.create_task(asyncio.to_thread(write_text_cache_to_s3, prefix, cache_key, text))
+    cache_write_tasks.add(task)
+    task.add_done_callback(lambda done: on_cache_write_done(done, f"{prefix}{cache_key}"))
+
+def on_cache_write_done(task: asyncio.Task, cache_key: str):
+    cache_write_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        log_error("S3 캐시 저장 실패", task.exception(), exc_info=False, cache_key=cache_key)
+
+# OCR 캐시 조회 함수 (프로세스 내 LRU 다음 S3 순서로 확인)
+# (S3 왕복 동안 다른 파일의 디코딩과 OCR을 막지 않도록 CPU 슬롯 밖에서 호출)
+async def get_cached_ocr(cache_key: str) -> Optional[str]:
+    cached = lru_get(ocr_cache, cache_key)
+    if cached is not None:
+        log_info("OCR 캐시 적중", text_length=len(cached))
+        return cached
+    
+    cached = await asyncio.to_thread(read_text_cache_from_s3, OCR_CACHE_PREFIX, cache_key)
+    if cached is not None:
+        log_info("S3 OCR 캐시 적중", text_length=len(cached))
+        lru_set(ocr_cache, cache_key, cached, OCR_CACHE_SIZE)
+    return cached
+
+# 스레드 풀에서 OCR 실행 (Tesseract는 블로킹이므로, 캐시는 get_cached_ocr로 먼저 확인)
+# 같은 이미지가 동시에 들어오면 (다중 선택 중복, 재시도 등) 먼저 시작한 OCR 작업의 결과를 함께 사용
+async def ocr_with_cache(content_hash: str, image: Image.Image) -> str:
+    cache_key = ocr_cache_key(content_hash)
+    cached = lru_get(ocr_cache, cache_key)
+    if cached is not None:
+        log_info("OCR 캐시 적중", text_length=len(cached))
+        return cached
+    
+    task = ocr_in_flight.get(cache_key)
+    if task is None:
+        task = asyncio.create_task(ocr_uncached(cache_key, image))
+        ocr_in_flight[cache_key] = task
+        task.add_done_callback(lambda _: ocr_in_flight.pop(cache_key, None))
+    else:
+        log_info("진행 중인 OCR 작업 재사용")
+    
+    # 요청 하나가 취소되어도 같은 작업을 기다리는 다른 요청에는 영향이 없도록 shield
+    return await asyncio.shield(task)
+
+# Tesseract 실행 후 두 캐시에 저장 (S3 저장은 응답을 기다리게 하지 않음)
+async def ocr_uncached(cache_key: str, image: Image.Image) -> str:
+    loop = asyncio.get_running_loop()
+    extracted_text = await loop.run_in_executor(executor, perform_ocr, image)
+    lru_set(ocr_cache, cache_key, extracted_text, OCR_CACHE_SIZE)
+    store_text_cache_in_background(OCR_CACHE_PREFIX, cache_key, extracted_text)
+    return extracted_text
 
-# S3에서 이미지 다운로드
-def download_from_s3(key: str) -> Image.Image:
+# 요약 요청 메시지 생성
+def build_summary_messages(extracted_text: str) -> List[Dict[str, str]]:
+    return [
+        {"role": "system", "content": KOREAN_SUMMARY_SYSTEM},
+        {"role": "user", "content": extracted_text}
+    ]
+
+# 요약 캐시 조회 함수 (프로세스 내 LRU 다음 S3 순서로 확인)
+async def get_cached_summary(cache_key: str) -> Optional[str]:
+    cached = lru_get(summary_cache, cache_key)
+    if cached is not None:
+        log_info("요약 캐시 적중", summary_length=len(cached))
+        return cached
+    
+    cached = await asyncio.to_thread(read_text_cache_from_s3, SUMMARY_CACHE_PREFIX, cache_key)
+    if cached is not None:
+        log_info("S3 요약 캐시 적중", summary_length=len(cached))
+        lru_set(summary_cache, cache_key, cached, SUMMARY_CACHE_SIZE)
+    return cached
+
+# 요약 캐시 저장 함수 (프로세스 내 LRU와 S3에 모두 저장)
+# (요청 처리 중에는 S3 저장을 기다리지 않고, 결과를 S3로만 전달하는 요약 워커만 저장이 끝날 때까지 기다림)
+async def store_summary(cache_key: str, summary: str, background: bool = True):
+    lru_set(summary_cache, cache_key, summary, SUMMARY_CACHE_SIZE)
+    if background:
+        store_text_cache_in_background(SUMMARY_CACHE_PREFIX, cache_key, summary)
+    else:
+        await asyncio.to_thread(write_text_cache_to_s3, SUMMARY_CACHE_PREFIX, cache_key, summary)
+
+# OpenAI로 요약 생성 함수
+async def generate_summary(extracted_text: str, store_in_background: bool = True) -> str:
     try:
-        # S3에서 이미지 데이터 가져오기
-        response = s3_client.get_object(
-            Bucket=S3_BUCKET,
-            Key=key
-        )
+        provider, model, max_tokens = route_model(extracted_text)
+        if provider == "local":
+            log_info("로컬 요약 사용", text_length=len(extracted_text))
+            return summarize_locally(extracted_text)
         
-        # 이미지 데이터 읽기
-        image_data = response['Body'].read()
+        cache_key = summary_cache_key(model, extracted_text)
+        cached = await get_cached_summary(cache_key)
+        if cached is not None:
+            return cached
         
-        # PIL 이미지로 변환
-        image = Image.open(io.BytesIO(image_data))
-        
-        return image
-    except ClientError as e:
-        log_error("S3 다운로드 중 오류 발생", e)
-        raise HTTPException(status_code=500, detail="이미지 다운로드 중 오류가 발생했습니다.")
-    finally:
-        # 메모리 정리
-        del image_data
-        gc.collect()
+        log_debug("OpenAI API 호출 시작", model=model, max_tokens=max_tokens)
+        summary_response = await openai_client.chat.completions.create(
+            model=model,
+            max_tokens=max_tokens,
+            temperature=SUMMARY_TEMPERATURE,
+            messages=build_summary_messages(extracted_text),
+            stream=False
+        )
+        summary = summary_response.choices[0].message.content
+        usage = summary_response.usage
+        prompt_tokens_details = getattr(usage, "prompt_tokens_details", None)
+        log_info(
+            "요약 완료",
+            summary_length=len(summary),
+            prompt_tokens=usage.prompt_tokens if usage else None,
+            cached_tokens=getattr(prompt_tokens_details, "cached_tokens", None)
+        )
+        await store_summary(cache_key, summary, background=store_in_background)
+        return summary
+    except Exception as e:
+        log_error("요약 생성 실패", e)
+        raise e
 
-@app.post("/api/ocr")
-async def process_image(file: UploadFile = File(...)):
+# OpenAI 요약을 토큰 단위로 스트리밍하는 함수
+async def stream_summary(extracted_text: str):
+    provider, model, max_tokens = route_model(extracted_text)
+    if provider == "local":
+        yield summarize_locally(extracted_text)
+        return
+    
+    cache_key = summary_cache_key(model, extracted_text)
+    cached = await get_cached_summary(cache_key)
+    if cached is not None:
+        yield cached
+        return
+    
+    log_debug("OpenAI 스트리밍 호출 시작")
+    stream = await openai_client.chat.completions.create(
+        model=model,
+        max_tokens=max_tokens,
+        temperature=SUMMARY_TEMPERATURE,
+        messages=build_summary_messages(extracted_text),
+        stream=True
+    )
+    parts = []
+    async for chunk in stream:
+        content = chunk.choices[0].delta.content
+        if content:
+            parts.append(content)
+            yield content
+    await store_summary(cache_key, "".join(parts))
+
+# 배치 작업 메타데이터를 저장할 S3 키 접두사
+BATCH_PREFIX = "batch/"
+
+# OpenAI Batch API로 요약 요청을 일괄 제출하는 함수 (실시간 호출 대비 50% 비용)
+async def submit_summary_batch(items: List[Dict[str, Any]]) -> str:
+    lines = []
+    for item in items:
+        lines.append(orjson.dumps({
+            "custom_id": item["custom_id"],
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": SUMMARY_MODEL,
+                "messages": build_summary_messages(item["text"]),
+                "max_tokens": SUMMARY_MAX_TOKENS,
+                "temperature": SUMMARY_TEMPERATURE
+            }
+        }))
+    batch_input = io.BytesIO(b"\n".join(lines))
+    
+    batch_file = await openai_client.files.create(
+        file=("summaries.jsonl", batch_input),
+        purpose="batch"
+    )
+    batch = await openai_client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    log_info("요약 배치 제출 완료", batch_id=batch.id, request_count=len(items))
+    return batch.id
+
+# 이미지 디코딩 함수: 한 번만 열고 load()로 디코딩하면서 손상 여부 확인
+# (JPEG는 draft()로 OCR에 필요한 크기까지만 DCT 단계에서 축소해 디코딩)
+# 반환값: (이미지, draft() 전 헤더 기준 원본 크기)
+def decode_image(file_obj: BinaryIO) -> Tuple[Image.Image, Tuple[int, int]]:
+    image = Image.open(file_obj)
+    header_size = image.size
+    image.draft('RGB', OCR_MAX_SIZE)
+    image.load()
+    return image, header_size
+
+# 업로드 파일의 크기를 확인하고 내용 해시를 계산하는 함수
+# 반환값: (내용 해시, 크기)
+# (업로드는 Starlette가 이미 임시 파일에 저장하므로 바이트로 복사하지 않고, 청크를 읽으면서 크기 확인과 해시 계산만 수행)
+async def hash_upload(file: UploadFile) -> Tuple[str, int]:
+    # 파일 크기 제한 (10MB)
+    if file.size is not None and file.size > MAX_FILE_SIZE:
+        raise ValueError("파일 크기가 10MB를 초과합니다")
+    
+    # 파일 내용을 청크 단위로 읽으면서 크기 제한 확인
+    digest = hashlib.blake2b(digest_size=16)
+    size = 0
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        size += len(chunk)
+        if size > MAX_FILE_SIZE:
+            raise ValueError("파일 크기가 10MB를 초과합니다")
+        digest.update(chunk)
+    log_debug(f"파일 읽기 완료", filename=file.filename, size=size)
+    
+    # 이미지 데이터 검증
+    if not size:
+        raise ValueError("파일 내용이 비어있습니다")
+    
+    return digest.hexdigest(), size
+
+# 업로드 파일을 이미지로 디코딩하고 검증하는 함수 (임시 파일에서 바로 디코딩, 이벤트 루프 밖에서 실행)
+async def decode_upload(file: UploadFile) -> Tuple[Image.Image, Tuple[int, int]]:
+    await file.seek(0)
     try:
-        log_info("이미지 처리 시작", filename=file.filename)
-        
-        # 파일 크기 제한 (10MB)
-        if file.size > 10 * 1024 * 1024:
-            raise HTTPException(status_code=400, detail="파일 크기는 10MB를 초과할 수 없습니다.")
-        
-        # 이미지 파일인지 확인
-        if not file.content_type.startswith('image/'):
-            raise HTTPException(status_code=400, detail="이미지 파일만 업로드 가능합니다.")
-        
-        # 이미지 데이터 읽기
-        image_data = await file.read()
-        
-        # PIL 이미지로 변환
-        image = Image.open(io.BytesIO(image_data))
-        
-        # 이미지 전처리
-        processed_image = preprocess_image(image)
-        
-        # OCR 처리
-        result = perform_ocr(processed_image)
-        
-        # S3에 업로드
-        filename = f"ocr_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}_{file.filename}"
-        image_url = upload_to_s3(file, filename)
-        
-        # 결과에 이미지 URL 추가
-        result["image_url"] = image_url
+        return await asyncio.to_thread(decode_image, file.file)
+    except (UnidentifiedImageError, OSError) as e:
+        # PIL 오류 메시지에는 임시 파일 객체의 repr 등 내부 정보가 들어 있으므로 서버 로그에만 기록
+        log_error("이미지 검증 실패", e, filename=file.filename)
+        raise ValueError("유효하지 않은 이미지 파일입니다") from e
+
+# S3 업로드용 JPEG 인코딩 함수 (미리보기 용도이므로 4:2:0 크로마 서브샘플링, 버퍼를 복사하지 않고 그대로 반환)
+def encode_jpeg(image: Image.Image) -> io.BytesIO:
+    img_byte_arr = io.BytesIO()
+    image.save(img_byte_arr, format='JPEG', quality=80, subsampling=2, optimize=False, progressive=False)
+    img_byte_arr.seek(0)
+    return img_byte_arr
+
+# 파일 객체를 청크 단위로 base64 인코딩하는 함수
+# (업로드 파일 전체를 bytes로 한 번 더 복사하지 않도록 3의 배수 크기로 잘라서 인코딩)
+# (S3 업로드 후에 호출되므로 upload_to_s3가 NonClosingFile로 감싸 파일을 닫지 않는 것에 의존)
+B64_CHUNK_SIZE = UPLOAD_CHUNK_SIZE - UPLOAD_CHUNK_SIZE % 3
+def b64encode_file(file_obj: BinaryIO) -> str:
+    file_obj.seek(0)
+    parts = []
+    while chunk := file_obj.read(B64_CHUNK_SIZE):
+        parts.append(base64.b64encode(chunk).decode('ascii'))
+    return "".join(parts)
+
+# 브라우저가 바로 표시할 수 있어 재인코딩 없이 원본 그대로 업로드하는 형식과 저장할 확장자
+# (S3 키의 확장자와 Content-Type은 클라이언트가 보낸 파일 이름이 아니라 디코딩한 형식으로 결정, 재인코딩한 이미지는 .jpg)
+PASSTHROUGH_EXTS = {'JPEG': '.jpg', 'PNG': '.png', 'WEBP': '.webp'}
+REENCODED_EXT = '.jpg'
+
+# 헤더만 읽어 전처리 없이 원본을 그대로 업로드할 수 있는 이미지면 저장할 확장자 반환 (픽셀은 디코딩하지 않음, 아니면 None)
+def passthrough_ext(file_obj: BinaryIO) -> Optional[str]:
+    try:
+        with Image.open(file_obj) as image:
+            width, height = image.size
+            if (
+                image.mode in ('L', 'RGB')
+                and width <= PREVIEW_MAX_SIZE[0]
+                and height <= PREVIEW_MAX_SIZE[1]
+            ):
+                return PASSTHROUGH_EXTS.get(image.format)
+    except (UnidentifiedImageError, OSError):
+        pass
+    return None
+
+# 업로드 이미지 캐시: 같은 내용의 이미지는 처음 시작한 S3 업로드 작업(결과는 프리사인드 URL)을 재사용
+# (S3 키도 내용 해시로 만들어 다른 컨테이너에서 다시 업로드하더라도 새 객체가 생기지 않고 같은 객체를 덮어씀)
+# (업로드 이미지는 버킷 수명 주기 규칙으로 1일 후 삭제되므로, 재사용한 URL이 가리키는 객체가 사라지지 않도록 1시간만 재사용)
+UPLOAD_CACHE_SIZE = 256
+UPLOAD_CACHE_TTL = 3600
+upload_cache = OrderedDict()  # 내용 해시 -> (업로드 시작 시각, 확장자, 업로드 작업)
+
+# 내용 해시로 업로드 이미지 키 생성 (128비트 해시를 UUID 형식으로 표기해 /api/image의 키 형식을 그대로 사용)
+def upload_key(content_hash: str, ext: str) -> str:
+    return f"{uuid.UUID(hex=content_hash)}{ext}"
+
+# 재사용할 수 있는 업로드 작업 조회 (없으면 None)
+# 반환값: (확장자, 업로드 작업)
+def get_cached_upload(content_hash: str) -> Optional[Tuple[str, asyncio.Task]]:
+    entry = lru_get(upload_cache, content_hash)
+    if entry is None or time.monotonic() - entry[0] >= UPLOAD_CACHE_TTL:
+        return None
+    return entry[1], entry[2]
+
+# 같은 이미지의 업로드 작업이 있으면 재사용하고, 없으면 S3 업로드 시작
+# 반환값: (확장자, 업로드 작업)
+def upload_once(content_hash: str, file_obj: BinaryIO, ext: str) -> Tuple[str, asyncio.Task]:
+    cached = get_cached_upload(content_hash)
+    if cached is not None:
+        log_info("중복 업로드 S3 객체 재사용", key=upload_key(content_hash, cached[0]))
+        return cached
+    
+    task = asyncio.create_task(upload_to_s3(file_obj, upload_key(content_hash, ext)))
+    lru_set(upload_cache, content_hash, (time.monotonic(), ext, task), UPLOAD_CACHE_SIZE)
+    task.add_done_callback(lambda done: forget_failed_upload(content_hash, done))
+    return ext, task
+
+# 실패한 업로드 작업은 재사용하지 않도록 캐시에서 제거 (오류는 upload_to_s3에서 기록)
+def forget_failed_upload(content_hash: str, task: asyncio.Task):
+    if task.cancelled() or task.exception() is not None:
+        entry = upload_cache.get(content_hash)
+        if entry is not None and entry[2] is task:
+            del upload_cache[content_hash]
+
+# 파일 한 개에 대한 검증, OCR, 요약, S3 업로드 처리
+# cpu_slots: 디코딩, 전처리, OCR처럼 CPU와 메모리를 쓰는 구간만 제한하는 세마포어
+# (네트워크 대기인 OCR 캐시 조회, OpenAI 요약, S3 업로드는 제한 밖에서 진행되어 다른 파일의 OCR을 막지 않음)
+async def _process_one(file: UploadFile, cpu_slots: asyncio.Semaphore, summarize: bool = True, inline: bool = False) -> Dict[str, Any]:
+    log_debug(f"파일 처리", filename=file.filename, content_type=file.content_type)
+    
+    content_hash, size = await hash_upload(file)
+    extracted_text = await get_cached_ocr(ocr_cache_key(content_hash))
+    
+    # 같은 파일이 다시 올라온 경우 (프론트엔드 재시도, 같은 파일 중복 선택) 디코딩, 전처리, OCR 없이 캐시 결과 사용
+    # 이미 업로드한 이미지는 S3 업로드도 생략 (inline 응답은 업로드한 바이트가 필요하므로 제외)
+    # 처음 업로드하는 이미지는 헤더만 확인해 원본을 그대로 업로드할 수 있는 경우에만, 그 외에는 아래 경로에서 디코딩 후 업로드
+    upload_task = None
+    if extracted_text is not None:
+        cached_upload = get_cached_upload(content_hash)
+        if cached_upload is not None and not inline:
+            log_info("중복 업로드 캐시 적중", filename=file.filename, text_length=len(extracted_text))
+            upload_ext, upload_task = cached_upload
+        else:
+            await file.seek(0)
+            upload_ext = await asyncio.to_thread(passthrough_ext, file.file)
+            if upload_ext is not None:
+                log_info("중복 업로드 OCR 캐시 적중", filename=file.filename, text_length=len(extracted_text))
+                await file.seek(0)
+                upload_file = file.file
+                upload_ext, upload_task = upload_once(content_hash, upload_file, upload_ext)
+    
+    if upload_task is None:
+        async with cpu_slots:
+            image, original_size = await decode_upload(file)
+            
+            # 이미지 처리 (원본 크기는 draft()로 줄어들기 전 헤더 기준으로 비교해야 큰 JPEG 원본이 그대로 업로드되지 않음)
+            log_debug(f"이미지 처리 시작", filename=file.filename)
+            original_format, original_mode = image.format, image.mode
+            processed_image = await asyncio.to_thread(preprocess_image, image)
+            
+            # 업로드할 파일 준비 (전처리로 바뀌지 않은 JPEG/PNG/WEBP는 업로드된 임시 파일을 그대로 사용)
+            unchanged = processed_image.size == original_size and processed_image.mode == original_mode
+            if unchanged and original_format in PASSTHROUGH_EXTS:
+                await file.seek(0)
+                upload_file = file.file
+                upload_ext = PASSTHROUGH_EXTS[original_format]
+            else:
+                upload_file = await asyncio.to_thread(encode_jpeg, processed_image)
+                upload_ext = REENCODED_EXT
+            
+            # S3 업로드는 OCR, 요약과 동시에 진행
+            upload_ext, upload_task = upload_once(content_hash, upload_file, upload_ext)
+            if extracted_text is None:
+                # OCR 처리 (동시에 들어온 같은 이미지는 진행 중인 작업 재사용)
+                log_debug(f"OCR 처리 시작", filename=file.filename)
+                extracted_text = await ocr_with_cache(content_hash, processed_image)
+            del image, processed_image  # 요약을 기다리는 동안 이미지 메모리를 잡고 있지 않도록 해제
+    
+    # OpenAI로 요약 생성 (배치 모드에서는 나중에 일괄 처리)
+    # (업로드 작업은 같은 이미지의 다른 요청과 공유하므로 OCR이나 요약이 실패해도 취소하지 않고, 기다릴 때도 shield)
+    summary = await generate_summary(extracted_text) if summarize else None
+    
+    image_url = await asyncio.shield(upload_task)
+    
+    log_info(f"파일 처리 완료", filename=file.filename)
+    result = {
+        "filename": file.filename,
+        "text": extracted_text,
+        "summary": summary,
+        "image": image_url,
+        "size": size,
+        "content_type": EXT_TO_MIME[upload_ext]  # S3에 저장된 이미지의 형식
+    }
+    
+    # 이미지 바이트가 꼭 필요한 클라이언트만 inline=true로 요청 (업로드한 이미지를 base64로 포함)
+    if inline:
+        result["image_data"] = await asyncio.to_thread(b64encode_file, upload_file)
+    
+    return result
+
+# 이미지 OCR 처리 및 요약 API 엔드포인트
+# 응답에는 이미지 바이트 대신 프리사인드 URL만 포함 (inline=true 쿼리 파라미터를 주면 base64 이미지도 포함)
+# columns=true 쿼리 파라미터를 주면 결과를 필드별 배열로 반환 (results[i] 대신 columns[필드][i])
+# async_summary=true면 OCR 결과만 바로 반환하고 요약은 큐로 넘김 (결과의 summary_id로 /api/summary/{summary_id} 조회)
+@app.post("/api/ocr")
+async def process_images(
+    background_tasks: BackgroundTasks,
+    files: List[UploadFile] = File(...),
+    batch_mode: bool = Form(False),
+    async_summary: bool = Form(False),
+    inline: bool = False,
+    columns: bool = False
+):
+    log_info("OCR 처리 시작")
+    
+    if not files:
+        log_info("업로드된 파일 없음")
+        return {"error": "업로드된 파일이 없습니다."}
+    
+    log_info(f"파일 처리 시작", file_count=len(files))
+    
+    # 파일별 처리를 동시에 실행 (전체 소요 시간 ≈ 가장 오래 걸린 파일)
+    # 이미지를 메모리에 올려 처리하는 파일 수는 CPU 수의 2배로 제한하여 Lambda 메모리 급증 방지
+    cpu_slots = asyncio.Semaphore(min(len(files), (os.cpu_count() or 1) * 2))
+    outcomes = await asyncio.gather(
+        *[_process_one(file, cpu_slots, summarize=not (batch_mode or async_summary), inline=inline) for file in files],
+        return_exceptions=True
+    )
+    
+    results = []
+    for file, outcome in zip(files, outcomes):
+        if isinstance(outcome, Exception):
+            log_error(f"파일 처리 중 오류", error_type=type(outcome).__name__, error_message=str(outcome), filename=file.filename)
+            results.append({
+                "filename": file.filename,
+                "error": str(outcome),
+                "status": "error"
+            })
+        else:
+            results.append(outcome)
+    
+    log_info(f"모든 파일 처리 완료", total_files=len(files), success_count=len([r for r in results if "error" not in r]))
+    
+    if batch_mode:
+        return await submit_batch_job(results)
+    
+    if async_summary:
+        await enqueue_summaries(results, background_tasks)
+    
+    if columns:
+        return {"count": len(results), "columns": to_columns(results)}
+    
+    return {"results": results}
+
+# 결과 목록(행 단위)을 필드별 배열(열 단위)로 변환하는 함수
+# (필드 이름을 파일마다 반복하지 않아 응답이 작아짐, 없는 필드는 None으로 채워 모든 배열의 길이를 맞춤)
+def to_columns(results: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    fields = list(dict.fromkeys(key for result in results for key in result))
+    return {field: [result.get(field) for result in results] for field in fields}
+
+# 비동기 요약 모드: 요약이 필요한 텍스트를 SQS로 보내고 결과에 summary_id를 채움
+# (summary_id는 요약 캐시 키이므로 워커가 저장한 S3 요약 캐시를 그대로 조회할 수 있음)
+async def enqueue_summaries(results: List[Dict[str, Any]], background_tasks: BackgroundTasks):
+    texts = {}  # 같은 텍스트는 한 번만 요약
+    for result in results:
+        if "error" in result:
+            continue
         
-        log_info("이미지 처리 완료", filename=file.filename)
+        # 짧은 텍스트와 이미 요약된 텍스트는 큐 없이 바로 채움
+        text = result["text"]
+        provider, model, _ = route_model(text)
+        if provider == "local":
+            result["summary"] = summarize_locally(text)
+            continue
+        summary_id = summary_cache_key(model, text)
+        cached = lru_get(summary_cache, summary_id)
+        if cached is not None:
+            result["summary"] = cached
+            continue
         
-        return result
-    except HTTPException:
+        result["summary_id"] = summary_id
+        texts[summary_id] = text
+    
+    if not texts:
+        return
+    
+    # 조회 API가 요청된 적 없는 ID(404)와 아직 처리 중인 ID(pending)를 구분할 수 있도록 대기 상태를 먼저 기록
+    outcomes = await asyncio.gather(
+        *[asyncio.to_thread(write_summary_status, summary_id, "pending") for summary_id in texts],
+        return_exceptions=True
+    )
+    for summary_id, outcome in zip(texts, outcomes):
+        if isinstance(outcome, Exception):
+            log_error("요약 상태 저장 실패", outcome, summary_id=summary_id, exc_info=False)
+    
+    # 큐에 넣지 못한 요약은 BackgroundTasks로 생성 (summary_id로 조회하는 클라이언트가 계속 pending을 받지 않도록)
+    # (Mangum은 BackgroundTasks까지 끝난 뒤 Lambda 응답을 반환하므로, Lambda에서는 이 요약 시간만큼 응답이 늦어짐)
+    fallback_ids = list(texts) if not SUMMARY_QUEUE_URL else await send_summary_messages(texts)
+    for summary_id in fallback_ids:
+        background_tasks.add_task(generate_summary_or_mark_failed, summary_id, texts[summary_id])
+
+# 요약 처리 상태를 저장할 S3 키 접두사 (완료된 요약은 요약 캐시에 저장되므로 pending/failed만 기록)
+SUMMARY_STATUS_PREFIX = "summary-status/"
+
+# 요약 처리 상태 저장 함수 (블로킹 호출이므로 스레드에서 실행)
+def write_summary_status(summary_id: str, status: str):
+    s3_client.put_object(
+        Bucket=S3_BUCKET,
+        Key=f"{SUMMARY_STATUS_PREFIX}{summary_id}.json",
+        Body=orjson.dumps({"status": status}),
+        ContentType="application/json"
+    )
+
+# 요약 처리 상태 조회 함수 (요청된 적 없는 ID면 None, 블로킹 호출이므로 스레드에서 실행)
+def read_summary_status(summary_id: str) -> Optional[str]:
+    try:
+        response = s3_client.get_object(Bucket=S3_BUCKET, Key=f"{SUMMARY_STATUS_PREFIX}{summary_id}.json")
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "NoSuchKey":
+            return None
         raise
+    return orjson.loads(response['Body'].read())["status"]
+
+# 더 이상 재시도하지 않는 요약을 실패로 기록하는 함수 (조회 API가 계속 pending을 반환하지 않도록)
+async def mark_summary_failed(summary_id: str):
+    try:
+        await asyncio.to_thread(write_summary_status, summary_id, "failed")
     except Exception as e:
-        log_error("이미지 처리 중 오류 발생", e)
-        raise HTTPException(status_code=500, detail="이미지 처리 중 오류가 발생했습니다.")
-    finally:
-        # 메모리 정리
-        if 'image_data' in locals():
-            del image_data
-        if 'image' in locals():
-            del image
-        if 'processed_image' in locals():
-            del processed_image
-        gc.collect()
+        log_error("요약 실패 상태 저장 실패", e, summary_id=summary_id, exc_info=False)
 
-@app.post("/api/generate-pdf")
-async def generate_pdf(image_url: str, text: str):
+# 큐를 사용할 수 없을 때 BackgroundTasks에서 요약을 생성하는 함수 (재시도가 없으므로 실패하면 바로 실패로 기록)
+async def generate_summary_or_mark_failed(summary_id: str, text: str):
     try:
-        log_info("PDF 생성 시작", image_url=image_url)
-        
-        # S3 키 추출
-        key = image_url.split('?')[0].split('/')[-1]
-        
-        # 이미지 다운로드
-        image = download_from_s3(key)
+        await generate_summary(text, store_in_background=False)
+    except Exception:
+        await mark_summary_failed(summary_id)
+
+# SQS 배치 전송 제한 (SendMessageBatch는 최대 10개, 메시지 합계 256KB)
+SQS_MAX_BATCH_ENTRIES = 10
+SQS_MAX_BATCH_BYTES = 256 * 1024
+
+# 요약 작업을 SQS로 전송하는 함수
+# 반환값: 전송하지 못한 summary_id 목록 (크기 초과, 전송 실패)
+async def send_summary_messages(texts: Dict[str, str]) -> List[str]:
+    failed_ids = []
+    batches = []
+    batch, batch_bytes = [], 0
+    for summary_id, text in texts.items():
+        body = orjson.dumps({"summary_id": summary_id, "text": text}).decode()
+        body_bytes = len(body.encode('utf-8'))
+        if body_bytes > SQS_MAX_BATCH_BYTES:
+            failed_ids.append(summary_id)
+            continue
+        if len(batch) == SQS_MAX_BATCH_ENTRIES or batch_bytes + body_bytes > SQS_MAX_BATCH_BYTES:
+            batches.append(batch)
+            batch, batch_bytes = [], 0
+        batch.append({"Id": summary_id, "MessageBody": body})
+        batch_bytes += body_bytes
+    if batch:
+        batches.append(batch)
+    
+    for batch in batches:
+        try:
+            response = await asyncio.to_thread(
+                sqs_client.send_message_batch, QueueUrl=SUMMARY_QUEUE_URL, Entries=batch
+            )
+            failed = [entry["Id"] for entry in response.get("Failed", [])]
+        except ClientError as e:
+            log_error("요약 큐 전송 실패", e, message_count=len(batch), exc_info=False)
+            failed = [entry["Id"] for entry in batch]
+        failed_ids.extend(failed)
+    
+    if failed_ids:
+        log_error("요약 큐 전송 실패, 백그라운드에서 요약 생성", failed_count=len(failed_ids), exc_info=False)
+    log_info("요약 작업 큐 전송 완료", message_count=len(texts) - len(failed_ids))
+    return failed_ids
+
+# 비동기 요약 결과 조회 API 엔드포인트
+@app.get("/api/summary/{summary_id}")
+async def get_summary(summary_id: str):
+    if not re.fullmatch(r"[0-9a-f]{32}", summary_id):
+        raise HTTPException(status_code=400, detail="잘못된 요약 ID입니다.")
+    summary = await get_cached_summary(summary_id)
+    if summary is not None:
+        return {"summary_id": summary_id, "status": "completed", "summary": summary}
+    
+    status = await asyncio.to_thread(read_summary_status, summary_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="요약 작업을 찾을 수 없습니다.")
+    return {"summary_id": summary_id, "status": status}
+
+# 배치 모드: 요약을 Batch API로 제출하고 작업 정보를 S3에 저장
+async def submit_batch_job(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    job_id = str(uuid.uuid4())
+    items = []
+    custom_ids = {}  # 같은 텍스트는 한 번만 배치에 포함
+    for result in results:
+        if "error" in result:
+            continue
         
-        # PDF 생성
-        pdf_buffer = io.BytesIO()
-        c = canvas.Canvas(pdf_buffer, pagesize=letter)
+        # 짧은 텍스트와 이미 요약된 텍스트는 배치 없이 바로 채움
+        text = result["text"]
+        if route_model(text)[0] == "local":
+            result["summary"] = summarize_locally(text)
+            continue
+        cached = lru_get(summary_cache, summary_cache_key(SUMMARY_MODEL, text))
+        if cached is not None:
+            result["summary"] = cached
+            continue
         
-        # 폰트 등록
-        pdfmetrics.registerFont(TTFont('NanumGothic', 'fonts/NanumGothic.ttf'))
-        c.setFont('NanumGothic', 12)
+        if text not in custom_ids:
+            custom_ids[text] = str(uuid.uuid4())
+            items.append({"custom_id": custom_ids[text], "text": text})
+        result["custom_id"] = custom_ids[text]
+    
+    if not items:
+        return {"results": results}
+    
+    batch_id = await submit_summary_batch(items)
+    await asyncio.to_thread(write_batch_job, job_id, {"batch_id": batch_id, "results": results})
+    log_info("배치 작업 저장 완료", job_id=job_id, batch_id=batch_id)
+    
+    return {
+        "job_id": job_id,
+        "batch_id": batch_id,
+        "status": "submitted",
+        "results": results
+    }
+
+# 배치 작업 정보를 S3에 저장하는 함수 (블로킹 호출이므로 스레드에서 실행)
+def write_batch_job(job_id: str, job: Dict[str, Any]):
+    s3_client.put_object(
+        Bucket=S3_BUCKET,
+        Key=f"{BATCH_PREFIX}{job_id}.json",
+        Body=orjson.dumps(job),
+        ContentType="application/json"
+    )
+
+# S3에서 배치 작업 정보를 읽는 함수 (없으면 None, 블로킹 호출이므로 스레드에서 실행)
+def read_batch_job(job_id: str) -> Optional[Dict[str, Any]]:
+    try:
+        response = s3_client.get_object(Bucket=S3_BUCKET, Key=f"{BATCH_PREFIX}{job_id}.json")
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "NoSuchKey":
+            return None
+        raise
+    return orjson.loads(response['Body'].read())
+
+# 배치 작업 상태 조회 및 결과 반환 API 엔드포인트
+@app.get("/api/ocr/batch/{job_id}")
+async def get_batch_job(job_id: str):
+    job = await asyncio.to_thread(read_batch_job, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="배치 작업을 찾을 수 없습니다.")
+    
+    batch = await openai_client.batches.retrieve(job["batch_id"])
+    if batch.status != "completed":
+        return {"job_id": job_id, "status": batch.status}
+    
+    # 모든 요청이 실패하면 출력 파일 없이 완료되므로 오류 파일 ID와 함께 실패로 반환
+    if not batch.output_file_id:
+        log_error("배치 작업 실패", job_id=job_id, batch_id=job["batch_id"], error_file_id=batch.error_file_id, exc_info=False)
+        return {"job_id": job_id, "status": "failed", "error_file_id": batch.error_file_id}
+    
+    # 출력 파일(JSONL)에서 custom_id별 요약 추출
+    output = await openai_client.files.content(batch.output_file_id)
+    summaries = {}
+    for line in output.content.splitlines():
+        if not line:
+            continue
+        record = orjson.loads(line)
+        body = (record.get("response") or {}).get("body") or {}
+        choices = body.get("choices") or []
+        if choices:
+            summaries[record["custom_id"]] = choices[0]["message"]["content"]
+    
+    for result in job["results"]:
+        custom_id = result.pop("custom_id", None)
+        if custom_id:
+            result["summary"] = summaries.get(custom_id)
+    
+    log_info("배치 작업 결과 반환", job_id=job_id, summary_count=len(summaries))
+    return {"job_id": job_id, "status": "completed", "results": job["results"]}
+
+# 이미지 OCR 처리 후 요약을 스트리밍으로 반환하는 API 엔드포인트
+@app.post("/api/ocr/stream")
+async def process_image_stream(file: UploadFile = File(...)):
+    log_info("OCR 스트리밍 처리 시작", filename=file.filename)
+    try:
+        content_hash, _ = await hash_upload(file)
+        extracted_text = await get_cached_ocr(ocr_cache_key(content_hash))
+        if extracted_text is None:
+            image, _ = await decode_upload(file)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if extracted_text is None:
+        processed_image = await asyncio.to_thread(preprocess_image, image)
+        extracted_text = await ocr_with_cache(content_hash, processed_image)
+    
+    return StreamingResponse(
+        stream_summary(extracted_text),
+        media_type="text/plain; charset=utf-8",
+        # gzip 버퍼링으로 토큰 전송이 지연되지 않도록 압축 제외
+        headers={"Content-Encoding": "identity"}
+    )
+
+# 업로드 이미지 키 형식 (upload_to_s3가 만드는 UUID + 이미지 확장자)
+UPLOAD_KEY_PATTERN = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}(\.[a-z]+)")
+
+# S3에 저장된 이미지를 스트리밍으로 반환하는 API 엔드포인트
+# (프리사인드 URL을 직접 사용할 수 없는 클라이언트용, 캐시/배치 객체 등 다른 키는 조회할 수 없도록 업로드 이미지 키만 허용)
+# (업로드 이미지는 버킷 수명 주기 규칙으로 1일 후 삭제되므로 프리사인드 URL과 같은 기간만 조회 가능)
+@app.get("/api/image/{key}")
+async def get_image(key: str):
+    match = UPLOAD_KEY_PATTERN.fullmatch(key)
+    if not match or match.group(1) not in EXT_TO_MIME:
+        raise HTTPException(status_code=404, detail="이미지를 찾을 수 없습니다.")
+    try:
+        response = await asyncio.to_thread(s3_client.get_object, Bucket=S3_BUCKET, Key=key)
+    except ClientError as e:
+        if e.response["Error"]["Code"] == "NoSuchKey":
+            raise HTTPException(status_code=404, detail="이미지를 찾을 수 없습니다.")
+        raise
+    return StreamingResponse(
+        response['Body'].iter_chunks(65536),
+        media_type=response.get('ContentType', 'application/octet-stream'),
+        # 이미 압축된 이미지 형식이므로 gzip 압축 제외
+        headers={"Content-Encoding": "identity"}
+    )
+
+# OCR 결과로 PDF 파일 작성
+# (페이지 콘텐츠 스트림을 Flate로 압축해 텍스트가 많은 PDF의 전송 크기를 줄임, rl_config 기본값에 의존하지 않도록 명시)
+def build_pdf(results: List[Dict[str, Any]], images: List[Optional[ImageReader]], path: str):
+    p = canvas.Canvas(path, pagesize=letter, pageCompression=1)
+    
+    for result, img in zip(results, images):
+        # showPage()는 글꼴을 기본값(Helvetica, 한글 글리프 없음)으로 되돌리므로 결과마다 다시 지정
+        p.setFont('NanumGothic', 12)
         
-        # 이미지 추가
-        c.drawImage(io.BytesIO(image.tobytes()), 100, 500, width=400, height=300)
+        # 이미지 추가 (다운로드에 실패한 이미지는 건너뜀)
+        if img is not None:
+            try:
+                img_width, img_height = img.getSize()
+                aspect = img_height / float(img_width)
+                display_width = 400
+                display_height = display_width * aspect
+                
+                p.drawImage(img, 100, 600, width=display_width, height=display_height)
+            except Exception as e:
+                log_error("PDF 이미지 처리 실패", e, image=result.get("image"))
         
         # 텍스트 추가
-        c.drawString(100, 450, "OCR 결과:")
-        text_object = c.beginText(100, 430)
-        for line in text.split('\n'):
-            text_object.textLine(line)
-        c.drawText(text_object)
+        p.drawString(100, 550, f"요약: {result['summary']}")
+        p.drawString(100, 500, "원문:")
         
-        c.save()
+        # 긴 텍스트를 하나의 텍스트 객체(BT ... ET 블록)로 작성
+        text_object = p.beginText(100, 480)
+        text_object.setFont('NanumGothic', 12, leading=20)
+        for line in result["text"].split('\n'):
+            if text_object.getY() < 100:  # 페이지 끝에 도달하면 새 페이지 생성
+                p.drawText(text_object)
+                p.showPage()
+                text_object = p.beginText(100, 700)
+                text_object.setFont('NanumGothic', 12, leading=20)
+            text_object.textLine(line)
+        p.drawText(text_object)
         
-        # PDF 데이터 반환
-        pdf_buffer.seek(0)
-        pdf_data = pdf_buffer.getvalue()
+        p.showPage()
+    
+    p.save()
+
+# PDF에 넣을 이미지 최대 크기 (폭 400pt로 표시되므로 약 200dpi면 충분)
+PDF_IMAGE_MAX_SIZE = (1200, 1200)
+
+# PDF에 넣을 이미지를 S3에서 다운로드해 표시 크기에 맞게 축소한 ImageReader 반환 (실패하면 None)
+# (큰 원본을 그대로 넣지 않아 PDF 크기와 메모리 사용량, 전송 시간이 줄어듦)
+# (ImageReader 생성과 헤더 파싱도 다운로드 스레드에서 병렬로 끝내고 PDF 작성 스레드는 그리기만 수행)
+def fetch_pdf_image(image_url: str) -> Optional[ImageReader]:
+    key = image_url.split('/')[-1].split('?')[0]
+    try:
+        response = s3_client.get_object(Bucket=S3_BUCKET, Key=key)
+        img_data = response['Body'].read()
         
-        log_info("PDF 생성 완료", image_url=image_url)
+        # 디코딩한 이미지는 with 블록을 벗어나면 바로 닫힘 (GC를 기다리지 않고 픽셀 버퍼 해제)
+        with Image.open(BytesIO(img_data)) as img:
+            width, height = img.size
+            if width <= PDF_IMAGE_MAX_SIZE[0] and height <= PDF_IMAGE_MAX_SIZE[1] and img.format == 'JPEG':
+                return ImageReader(BytesIO(img_data))
+            
+            img.draft('RGB', PDF_IMAGE_MAX_SIZE)
+            img.thumbnail(PDF_IMAGE_MAX_SIZE, Image.Resampling.BILINEAR)
+            
+            # JPEG는 ReportLab이 다시 인코딩하지 않고 그대로 삽입
+            buffer = BytesIO()
+            if img.mode in ('L', 'RGB'):
+                img.save(buffer, format='JPEG', quality=80)
+            else:
+                with img.convert('RGB') as rgb:
+                    rgb.save(buffer, format='JPEG', quality=80)
         
-        return {
-            "pdf_data": pdf_data,
-            "content_type": "application/pdf"
-        }
+        buffer.seek(0)
+        return ImageReader(buffer)
     except Exception as e:
-        log_error("PDF 생성 중 오류 발생", e)
-        raise HTTPException(status_code=500, detail="PDF 생성 중 오류가 발생했습니다.")
-    finally:
-        # 메모리 정리
-        if 'image' in locals():
-            del image
-        if 'pdf_buffer' in locals():
-            del pdf_buffer
-        if 'pdf_data' in locals():
-            del pdf_data
-        gc.collect()
+        log_error("PDF 이미지 다운로드 실패", e, key=key, exc_info=False)
+        return None
 
+# PDF 생성 API 엔드포인트
+# 입력: OCR 처리 결과
+# 출력: PDF 파일 (다운로드)
+@app.post("/api/generate-pdf")
+async def generate_pdf(data: dict, background_tasks: BackgroundTasks):
+    # 메모리 대신 /tmp 임시 파일에 PDF 작성 (응답 전송 후 삭제)
+    results = data["results"]
+    
+    # 모든 이미지를 동시에 다운로드한 뒤 PDF 작성은 스레드에서 실행
+    images = await asyncio.gather(*(asyncio.to_thread(fetch_pdf_image, r["image"]) for r in results))
+    
+    pdf_file = tempfile.NamedTemporaryFile(suffix=".pdf", delete=False)
+    pdf_file.close()
+    try:
+        await asyncio.to_thread(build_pdf, results, images, pdf_file.name)
+    except Exception:
+        os.unlink(pdf_file.name)
+        raise
+    background_tasks.add_task(os.unlink, pdf_file.name)
+    
+    return FileResponse(
+        pdf_file.name,
+        media_type="application/pdf",
+        filename="ocr_results.pdf",
+        # 페이지 콘텐츠와 이미지가 이미 압축되어 있으므로 gzip 압축 제외
+        headers={"Content-Encoding": "identity"}
+    )
+
+# 서버 상태 확인을 위한 헬스 체크 엔드포인트
 @app.get("/api/health")
 async def health_check():
     try:
-        log_info("헬스 체크 시작")
-        
-        # S3 버킷 연결 테스트
-        try:
-            s3_client.head_bucket(Bucket=S3_BUCKET)
-            s3_status = "connected"
-        except ClientError as e:
-            s3_status = f"error: {str(e)}"
-        
-        # OpenAI 연결 테스트
-        try:
-            openai.Model.list()
-            openai_status = "connected"
-        except Exception as e:
-            openai_status = f"error: {str(e)}"
+        log_debug("헬스 체크 시작", bucket=S3_BUCKET)
         
-        log_info("헬스 체크 완료", s3_status=s3_status, openai_status=openai_status)
+        # S3 버킷 존재 여부 확인
+        s3_client.head_bucket(Bucket=S3_BUCKET)
+        log_info("S3 버킷 연결 확인 완료")
         
         return {
             "status": "healthy",
-            "s3": {
-                "bucket": S3_BUCKET,
-                "status": s3_status
-            },
-            "openai": {
-                "status": openai_status
-            }
+            "s3_status": "connected",
+            "bucket": S3_BUCKET
         }
     except Exception as e:
-        log_error("헬스 체크 중 오류 발생", e)
-        raise HTTPException(status_code=500, detail="헬스 체크 중 오류가 발생했습니다.")
+        log_error("헬스 체크 실패", e, bucket=S3_BUCKET)
+        return {
+            "status": "unhealthy",
+            "s3_status": "error",
+            "error": str(e),
+            "bucket": S3_BUCKET
+        }
 
+# 요약 메시지 최대 수신 횟수 (이후에는 배달 못한 편지 큐로 이동, ocr_stack.py의 설정과 같은 값)
+SUMMARY_MAX_RECEIVE_COUNT = int(os.getenv("SUMMARY_MAX_RECEIVE_COUNT", 3))
+
+# SQS 요약 메시지 한 개 처리 (본문 파싱도 메시지별로 하여 잘못된 메시지 하나가 배치 전체를 실패시키지 않음)
+# 마지막 시도까지 실패하면 배달 못한 편지 큐로 옮겨지기 전에 실패 상태를 기록
+async def process_summary_message(record: Dict[str, Any]):
+    body = orjson.loads(record["body"])
+    try:
+        await generate_summary(body["text"], store_in_background=False)
+    except Exception:
+        receive_count = int(record.get("attributes", {}).get("ApproximateReceiveCount", 1))
+        if receive_count >= SUMMARY_MAX_RECEIVE_COUNT and body.get("summary_id"):
+            await mark_summary_failed(body["summary_id"])
+        raise
+
+# SQS 요약 작업 처리 (실패한 메시지만 다시 큐로 돌려보냄)
+async def process_summary_messages(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    outcomes = await asyncio.gather(
+        *[process_summary_message(record) for record in records],
+        return_exceptions=True
+    )
+    failures = [
+        {"itemIdentifier": record["messageId"]}
+        for record, outcome in zip(records, outcomes)
+        if isinstance(outcome, Exception)
+    ]
+    log_info("요약 작업 처리 완료", message_count=len(records), failure_count=len(failures))
+    return {"batchItemFailures": failures}
+
+# Lambda 핸들러: SQS 이벤트는 요약 워커로, 나머지는 FastAPI로 전달
+# (Mangum과 같은 이벤트 루프를 사용해야 공유 httpx 클라이언트의 연결을 재사용할 수 있음)
 def handler(event, context):
-    from mangum import Mangum
-    handler = Mangum(app)
-    return handler(event, context)
+    records = event.get("Records") or []
+    if records and records[0].get("eventSource") == "aws:sqs":
+        return asyncio.get_event_loop().run_until_complete(process_summary_messages(records))
+    return asgi_handler(event, context)
+
+# 콜드 스타트(INIT) 단계에서 한 번만 수행하는 워밍업
+# 빈 이미지로 OCR을 한 번 실행해 언어 모델을 미리 로드하고, OpenAI 도메인의 DNS 조회와 S3 프리사인드 URL 서명을 미리 수행
+# (OpenAI 연결 풀은 요청을 처리하는 이벤트 루프에 묶이므로 여기서 미리 연결하지 않음)
+def warm_up():
+    try:
+        blank = Image.new('L', (32, 32), 255)
+        if PyTessBaseAPI is None:
+            pytesseract.image_to_string(blank, lang=OCR_LANG)
+        else:
+            for api in list(tess_pool.queue):
+                api.SetImageBytes(blank.tobytes(), 32, 32, 1, 32)
+                api.GetUTF8Text()
+                api.Clear()
+        log_info("Tesseract 워밍업 완료", pool_size=tess_pool.qsize())
+        socket.getaddrinfo("api.openai.com", 443)
+        presign_get_url("warm-up")
+    except Exception as e:
+        log_error("워밍업 실패", e)
+
+warm_up()
@@ -5,6 +5,9 @@ from aws_cdk import (
     aws_apigateway as apigw,
     aws_cloudwatch as cloudwatch,
     aws_iam as iam,
+    aws_sqs as sqs,
+    aws_lambda_event_sources as lambda_events,
+    aws_ecr_assets as ecr_assets,
     Duration,
     RemovalPolicy,
     CfnOutput
@@ -38,34 +41,70 @@ class OcrBackendStack(Stack):
             ]
         )
 
-        # Lambda 함수 생성
-        function = lambda_.Function(
+        # 계속 실패하는 요약 작업을 보관하는 배달 못한 편지 큐 (3회 시도 후 이동, 워커는 마지막 시도에서 실패 상태를 기록)
+        summary_max_receive_count = 3
+        summary_dlq = sqs.Queue(
+            self, "SummaryDeadLetterQueue",
+            retention_period=Duration.days(4)
+        )
+
+        # 비동기 요약 작업 큐 (가시성 제한 시간은 Lambda 제한 시간의 6배 권장값)
+        summary_queue = sqs.Queue(
+            self, "SummaryQueue",
+            visibility_timeout=Duration.seconds(360),
+            retention_period=Duration.days(1),
+            dead_letter_queue=sqs.DeadLetterQueue(max_receive_count=summary_max_receive_count, queue=summary_dlq)
+        )
+
+        # Lambda 함수 생성 (저장소 루트의 Dockerfile로 Tesseract, 한국어 언어 데이터, tesserocr가 포함된 컨테이너 이미지 빌드)
+        # Graviton(ARM64)은 GB-초당 요금이 x86보다 20% 저렴하고, OCR은 CPU 바운드라 메모리에 비례해 할당되는 vCPU를 늘림 (5120MB ≈ 3 vCPU)
+        function = lambda_.DockerImageFunction(
             self, "OcrFunction",
-            runtime=lambda_.Runtime.PYTHON_3_9,
-            handler="main.handler",
-            code=lambda_.Code.from_asset("ocr_backend/lambda"),
-            memory_size=3008,
+            code=lambda_.DockerImageCode.from_image_asset(".", platform=ecr_assets.Platform.LINUX_ARM64),
+            architecture=lambda_.Architecture.ARM_64,
+            memory_size=5120,
             timeout=Duration.seconds(60),
             environment={
                 "S3_BUCKET": bucket.bucket_name,
-                "OPENAI_API_KEY": "{{resolve:ssm:/ocr/OPENAI_API_KEY}}"
+                "OPENAI_API_KEY": "{{resolve:ssm:/ocr/OPENAI_API_KEY}}",
+                "LOG_LEVEL": "INFO",
+                "ALLOWED_ORIGINS": "*",
+                "SUMMARY_QUEUE_URL": summary_queue.queue_url,
+                "SUMMARY_MAX_RECEIVE_COUNT": str(summary_max_receive_count)
             }
         )
 
         # Lambda 함수에 S3 접근 권한 부여
         bucket.grant_read_write(function)
 
+        # 같은 함수가 요약 큐를 소비 (실패한 메시지만 재시도)
+        summary_queue.grant_send_messages(function)
+        function.add_event_source(lambda_events.SqsEventSource(
+            summary_queue,
+            batch_size=10,
+            report_batch_item_failures=True
+        ))
+
+        # API Gateway가 호출하는 별칭
+        # cdk deploy -c provisioned_concurrency=N 을 지정한 경우에만 프로비저닝된 동시성 사용
+        # (모듈 로드 시 Tesseract 워밍업이 사용자 요청 전에 끝난 컨테이너를 유지하지만, 상시 과금되므로 기본값은 사용하지 않음)
+        provisioned_concurrency = self.node.try_get_context("provisioned_concurrency")
+        live_alias = lambda_.Alias(
+            self, "OcrFunctionLive",
+            alias_name="live",
+            version=function.current_version,
+            provisioned_concurrent_executions=int(provisioned_concurrency) if provisioned_concurrency else None
+        )
+
         # API Gateway 생성
+        # Mangum은 gzip 응답과 이미지처럼 UTF-8로 디코딩되지 않는 본문을 base64(isBase64Encoded)로 반환하므로,
+        # 모든 타입을 바이너리로 등록해 API Gateway가 원래 바이트로 복원해서 전달하도록 함
+        # (모든 타입이 바이너리이면 MOCK 통합의 CORS 프리플라이트 응답이 깨지므로, OPTIONS도 프록시로 Lambda에 전달해 CORSMiddleware가 응답)
         api = apigw.LambdaRestApi(
             self, "OcrApi",
-            handler=function,
+            handler=live_alias,
             proxy=True,
-            default_cors_preflight_options=apigw.CorsOptions(
-                allow_origins=apigw.Cors.ALL_ORIGINS,
-                allow_methods=apigw.Cors.ALL_METHODS,
-                allow_headers=apigw.Cors.DEFAULT_HEADERS,
-                max_age=Duration.days(1)
-            )
+            binary_media_types=["*/*"]
         )
 
         # CloudWatch 알람
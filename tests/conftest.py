@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+# main 모듈은 import 시 boto3/OpenAI 클라이언트를 만들기 때문에 가짜 설정을 먼저 지정
+os.environ.setdefault("AWS_DEFAULT_REGION", "ap-northeast-2")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+os.environ.setdefault("OPENAI_API_KEY", "testing")
+os.environ.setdefault("S3_BUCKET", "ocr-test-bucket")
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "ocr_backend", "lambda"))
+
+
+# 모듈 전역 캐시가 테스트 사이에 공유되지 않도록 매 테스트 전에 비움
+@pytest.fixture(autouse=True)
+def clear_caches():
+    import main
+
+    for cache in (main.ocr_cache, main.summary_cache, main.upload_cache):
+        cache.clear()
@@ -0,0 +1,147 @@
+import io
+import os
+
+import pytest
+from botocore.response import StreamingBody
+from botocore.stub import Stubber
+from fastapi.testclient import TestClient
+
+import main
+
+IMAGE_KEY = "0f8fad5b-d9cb-469f-a165-70867728950e.png"
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)
+
+
+@pytest.fixture
+def s3_stub():
+    with Stubber(main.s3_client) as stubber:
+        yield stubber
+        stubber.assert_no_pending_responses()
+
+
+# 이미 압축된 이미지는 gzip을 요청해도 다시 압축하지 않고 원본 바이트 그대로 반환해야 함
+def test_image_is_not_gzipped(client, s3_stub):
+    content = os.urandom(64 * 1024)
+    s3_stub.add_response(
+        "get_object",
+        {"Body": StreamingBody(io.BytesIO(content), len(content)), "ContentType": "image/png"},
+        {"Bucket": main.S3_BUCKET, "Key": IMAGE_KEY},
+    )
+
+    response = client.get(f"/api/image/{IMAGE_KEY}", headers={"Accept-Encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers.get("content-encoding") != "gzip"
+    assert response.content == content
+
+
+# 업로드 이미지 키 형식이 아닌 객체(캐시, 배치 작업 등)는 조회할 수 없어야 함
+@pytest.mark.parametrize("key", ["batch%2Fjob.json", "ocr-cache.txt", IMAGE_KEY.replace(".png", ".json")])
+def test_non_image_keys_are_not_found(client, key):
+    assert client.get(f"/api/image/{key}").status_code == 404
+
+
+# API Gateway의 MOCK 프리플라이트 대신 CORSMiddleware가 OPTIONS 요청에 응답해야 함
+def test_cors_preflight_is_answered_by_the_app(client):
+    origin = main.ALLOWED_ORIGINS[0]
+    response = client.options(
+        "/api/ocr",
+        headers={"Origin": origin, "Access-Control-Request-Method": "POST"},
+    )
+
+    assert response.status_code == 200
+    assert response.headers["access-control-allow-origin"] == origin
+
+
+# 이미지가 아닌 파일은 내부 객체 정보 없이 고정된 오류 메시지를 반환해야 함
+def test_invalid_image_error_does_not_leak_internals(client, monkeypatch):
+    monkeypatch.setattr(main, "read_text_cache_from_s3", lambda prefix, cache_key: None)
+
+    response = client.post("/api/ocr", files={"files": ("page.png", b"not an image" * 10, "image/png")})
+
+    assert response.status_code == 200
+    [result] = response.json()["results"]
+    assert result == {"filename": "page.png", "error": "유효하지 않은 이미지 파일입니다", "status": "error"}
+
+
+@pytest.fixture
+def fake_pipeline(monkeypatch):
+    uploaded = []
+
+    def upload_fileobj(file_obj, bucket, key, ExtraArgs=None, Config=None):
+        uploaded.append(key)
+
+    monkeypatch.setattr(main.s3_client, "upload_fileobj", upload_fileobj)
+    monkeypatch.setattr(main, "perform_ocr", lambda image: "인식된 텍스트")
+    monkeypatch.setattr(main, "read_text_cache_from_s3", lambda prefix, cache_key: None)
+    monkeypatch.setattr(main, "write_text_cache_to_s3", lambda prefix, cache_key, text: None)
+    return uploaded
+
+
+def png(color) -> bytes:
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 8), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+# Content-Length가 요청 크기 제한을 넘으면 본문을 읽기 전에 413을 반환해야 함 (CORS 헤더 포함)
+def test_oversized_request_is_rejected_before_reading(client):
+    origin = main.ALLOWED_ORIGINS[0]
+    response = client.post(
+        "/api/ocr",
+        content=b"x",
+        headers={"Content-Length": str(main.MAX_REQUEST_SIZE + 1), "Origin": origin},
+    )
+
+    assert response.status_code == 413
+    assert response.headers["access-control-allow-origin"] == origin
+
+
+# 한 파일의 오류는 그 파일의 결과에만 나타나고 나머지 파일은 정상 처리되어야 함
+def test_one_bad_file_does_not_fail_the_others(client, fake_pipeline):
+    too_large = b"\0" * (main.MAX_FILE_SIZE + 1)
+    response = client.post(
+        "/api/ocr",
+        files=[
+            ("files", ("ok.png", png((1, 1, 1)), "image/png")),
+            ("files", ("big.png", too_large, "image/png")),
+        ],
+    )
+
+    ok, big = response.json()["results"]
+    # 짧은 텍스트는 OpenAI 없이 로컬 요약
+    assert (ok["text"], ok["summary"]) == ("인식된 텍스트", "인식된 텍스트")
+    assert big == {"filename": "big.png", "error": "파일 크기가 10MB를 초과합니다", "status": "error"}
+    assert len(fake_pipeline) == 1
+
+
+# columns=true면 필드별 배열로 반환하고, 없는 필드는 None으로 채워 길이를 맞춰야 함
+def test_columns_output(client, fake_pipeline, monkeypatch):
+    async def generate_summary(text, store_in_background=True):
+        return "요약"
+
+    monkeypatch.setattr(main, "generate_summary", generate_summary)
+    response = client.post(
+        "/api/ocr",
+        files=[
+            ("files", ("a.png", png((2, 2, 2)), "image/png")),
+            ("files", ("b.txt", b"not an image", "text/plain")),
+        ],
+        params={"columns": "true"},
+    )
+
+    body = response.json()
+    assert body["count"] == 2
+    columns = body["columns"]
+    assert columns["filename"] == ["a.png", "b.txt"]
+    assert columns["summary"] == ["요약", None]
+    assert columns["content_type"] == ["image/png", None]
+    assert columns["status"] == [None, "error"]
+    assert all(len(values) == 2 for values in columns.values())
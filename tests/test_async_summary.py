@@ -0,0 +1,162 @@
+import asyncio
+
+import pytest
+from botocore.stub import Stubber
+from fastapi import BackgroundTasks, HTTPException
+
+import main
+
+# 로컬 요약 기준(40자)보다 길어 OpenAI 요약 대상이 되는 텍스트
+SENT_TEXT = "첫 번째 문서입니다. 회의는 다음 주 월요일 오전 10시에 본관 3층 대회의실에서 열리며, 참석자는 사전에 안건 자료를 검토해 주시기 바랍니다."
+FAILED_TEXT = "두 번째 문서입니다. 계약 기간은 2024년 1월 1일부터 12월 31일까지이며 별도의 해지 통보가 없는 한 동일한 조건으로 1년씩 자동 연장됩니다."
+
+
+@pytest.fixture
+def statuses(monkeypatch):
+    written = {}
+    monkeypatch.setattr(main, "write_summary_status", lambda summary_id, status: written.__setitem__(summary_id, status))
+    monkeypatch.setattr(main, "read_summary_status", lambda summary_id: written.get(summary_id))
+    return written
+
+
+@pytest.fixture
+def sqs_stub(monkeypatch, statuses):
+    monkeypatch.setattr(main, "SUMMARY_QUEUE_URL", "https://sqs.ap-northeast-2.amazonaws.com/123456789012/summary")
+    with Stubber(main.sqs_client) as stubber:
+        yield stubber
+        stubber.assert_no_pending_responses()
+
+
+@pytest.fixture
+def no_cached_summaries(monkeypatch):
+    monkeypatch.setattr(main, "read_text_cache_from_s3", lambda prefix, cache_key: None)
+    main.summary_cache.clear()
+
+
+def summary_id_of(text: str) -> str:
+    return main.summary_cache_key(main.route_model(text)[1], text)
+
+
+# 큐 전송에 실패한 요약은 summary_id를 유지한 채 BackgroundTasks로 생성되어야 함
+def test_failed_queue_entries_fall_back_to_background_tasks(sqs_stub, statuses):
+    results = [{"text": SENT_TEXT}, {"text": FAILED_TEXT}]
+    sent_id = summary_id_of(SENT_TEXT)
+    failed_id = summary_id_of(FAILED_TEXT)
+    sqs_stub.add_response(
+        "send_message_batch",
+        {
+            "Successful": [{"Id": sent_id, "MessageId": "m1", "MD5OfMessageBody": "x"}],
+            "Failed": [{"Id": failed_id, "SenderFault": False, "Code": "InternalError"}],
+        },
+    )
+    background_tasks = BackgroundTasks()
+
+    asyncio.run(main.enqueue_summaries(results, background_tasks))
+
+    assert [result["summary_id"] for result in results] == [sent_id, failed_id]
+    assert statuses == {sent_id: "pending", failed_id: "pending"}
+    assert [(task.func, task.args) for task in background_tasks.tasks] == [
+        (main.generate_summary_or_mark_failed, (failed_id, FAILED_TEXT))
+    ]
+
+
+# SendMessageBatch 제한(256KB)을 넘는 메시지는 전송하지 않고 BackgroundTasks로 생성되어야 함
+def test_oversized_message_is_not_sent(sqs_stub):
+    long_text = "가" * (main.SQS_MAX_BATCH_BYTES // 3 + 1)
+    results = [{"text": long_text}]
+    background_tasks = BackgroundTasks()
+
+    asyncio.run(main.enqueue_summaries(results, background_tasks))
+
+    assert "summary_id" in results[0]
+    assert [task.args for task in background_tasks.tasks] == [(results[0]["summary_id"], long_text)]
+
+
+# 요청된 적 없는 요약 ID는 pending이 아니라 404를 반환해야 함
+def test_unknown_summary_id_is_not_found(statuses, no_cached_summaries):
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(main.get_summary("0" * 32))
+
+    assert error.value.status_code == 404
+
+
+# 대기 중인 요약과 실패한 요약은 각각의 상태를 반환해야 함
+def test_summary_status_is_reported(statuses, no_cached_summaries):
+    statuses["a" * 32] = "pending"
+    statuses["b" * 32] = "failed"
+
+    assert asyncio.run(main.get_summary("a" * 32)) == {"summary_id": "a" * 32, "status": "pending"}
+    assert asyncio.run(main.get_summary("b" * 32)) == {"summary_id": "b" * 32, "status": "failed"}
+
+
+def make_record(message_id: str, body: str, receive_count: int = 1) -> dict:
+    return {"messageId": message_id, "body": body, "attributes": {"ApproximateReceiveCount": str(receive_count)}}
+
+
+# 잘못된 메시지 하나는 그 메시지만 실패로 보고해야 함
+def test_malformed_message_fails_only_itself(monkeypatch):
+    async def generate_summary(text, store_in_background=True):
+        return "요약"
+
+    monkeypatch.setattr(main, "generate_summary", generate_summary)
+    records = [
+        make_record("good", main.orjson.dumps({"summary_id": "a" * 32, "text": SENT_TEXT}).decode()),
+        make_record("bad", "not json"),
+    ]
+
+    response = asyncio.run(main.process_summary_messages(records))
+
+    assert response == {"batchItemFailures": [{"itemIdentifier": "bad"}]}
+
+
+# 마지막 시도에서 실패한 요약은 배달 못한 편지 큐로 가기 전에 failed로 기록해야 함 (그 전 시도는 재시도만)
+def test_last_failed_attempt_marks_summary_failed(monkeypatch, statuses):
+    async def generate_summary(text, store_in_background=True):
+        raise RuntimeError("OpenAI unavailable")
+
+    monkeypatch.setattr(main, "generate_summary", generate_summary)
+    body = main.orjson.dumps({"summary_id": "c" * 32, "text": SENT_TEXT}).decode()
+
+    first = asyncio.run(main.process_summary_messages([make_record("m1", body, receive_count=1)]))
+    assert statuses == {}
+    last = asyncio.run(main.process_summary_messages([make_record("m1", body, receive_count=main.SUMMARY_MAX_RECEIVE_COUNT)]))
+
+    assert first == last == {"batchItemFailures": [{"itemIdentifier": "m1"}]}
+    assert statuses == {"c" * 32: "failed"}
+
+
+# BackgroundTasks로 생성하다 실패한 요약은 재시도가 없으므로 바로 failed로 기록해야 함
+def test_background_fallback_failure_marks_summary_failed(monkeypatch, statuses):
+    async def generate_summary(text, store_in_background=True):
+        raise RuntimeError("OpenAI unavailable")
+
+    monkeypatch.setattr(main, "generate_summary", generate_summary)
+
+    asyncio.run(main.generate_summary_or_mark_failed("d" * 32, SENT_TEXT))
+
+    assert statuses == {"d" * 32: "failed"}
+
+
+# SendMessageBatch는 최대 10개씩 보내야 함 (11개면 두 번 전송)
+def test_messages_are_sent_in_batches_of_ten(sqs_stub):
+    texts = {f"{i:032x}": f"{i}번 문서의 본문입니다." for i in range(11)}
+    ids = list(texts)
+    for batch in (ids[:10], ids[10:]):
+        sqs_stub.add_response(
+            "send_message_batch",
+            {"Successful": [{"Id": summary_id, "MessageId": summary_id, "MD5OfMessageBody": "x"} for summary_id in batch], "Failed": []},
+            {"QueueUrl": main.SUMMARY_QUEUE_URL, "Entries": [
+                {"Id": summary_id, "MessageBody": main.orjson.dumps({"summary_id": summary_id, "text": texts[summary_id]}).decode()}
+                for summary_id in batch
+            ]},
+        )
+
+    assert asyncio.run(main.send_summary_messages(texts)) == []
+
+
+# 큐 전송 자체가 실패하면(ClientError) 그 배치의 모든 요약을 BackgroundTasks로 넘겨야 함
+def test_client_error_falls_back_for_the_whole_batch(sqs_stub):
+    texts = {"a" * 32: SENT_TEXT, "b" * 32: FAILED_TEXT}
+    sqs_stub.add_client_error("send_message_batch", service_error_code="AWS.SimpleQueueService.NonExistentQueue")
+
+    assert asyncio.run(main.send_summary_messages(texts)) == ["a" * 32, "b" * 32]
@@ -0,0 +1,102 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+
+import main
+
+# 로컬 요약 기준(40자)보다 길어 배치 요약 대상이 되는 텍스트
+TEXT = "분기 실적 보고서입니다. 3분기 매출은 전년 동기 대비 12% 증가한 1,250억 원이며, 영업이익은 신규 사업 투자로 소폭 감소했습니다."
+
+
+@pytest.fixture
+def jobs(monkeypatch):
+    stored = {}
+    monkeypatch.setattr(main, "write_batch_job", lambda job_id, job: stored.__setitem__(job_id, main.orjson.loads(main.orjson.dumps(job))))
+    monkeypatch.setattr(main, "read_batch_job", lambda job_id: stored.get(job_id))
+    return stored
+
+
+@pytest.fixture
+def fake_batches(monkeypatch):
+    state = {"submitted": [], "batch": None, "output": b""}
+
+    async def create_file(file, purpose):
+        name, buffer = file
+        state["submitted"] = [main.orjson.loads(line) for line in buffer.getvalue().splitlines()]
+        return SimpleNamespace(id="file-in")
+
+    async def create_batch(input_file_id, endpoint, completion_window):
+        return SimpleNamespace(id="batch-1")
+
+    async def retrieve(batch_id):
+        return state["batch"]
+
+    async def content(file_id):
+        return SimpleNamespace(content=state["output"])
+
+    monkeypatch.setattr(main.openai_client.files, "create", create_file)
+    monkeypatch.setattr(main.openai_client.files, "content", content)
+    monkeypatch.setattr(main.openai_client.batches, "create", create_batch)
+    monkeypatch.setattr(main.openai_client.batches, "retrieve", retrieve)
+    return state
+
+
+# 제출 → 진행 중 → 완료까지 배치 작업의 요약이 custom_id로 결과에 채워져야 함
+def test_batch_job_lifecycle(jobs, fake_batches):
+    results = [
+        {"filename": "a.png", "text": TEXT},
+        {"filename": "b.png", "text": TEXT},  # 같은 텍스트는 한 번만 제출
+        {"filename": "c.png", "text": "짧은 제목"},  # 짧은 텍스트는 바로 로컬 요약
+        {"filename": "d.png", "error": "유효하지 않은 이미지 파일입니다", "status": "error"},
+    ]
+
+    submitted = asyncio.run(main.submit_batch_job(results))
+
+    assert submitted["status"] == "submitted"
+    assert submitted["batch_id"] == "batch-1"
+    [request] = fake_batches["submitted"]
+    assert request["body"]["model"] == main.SUMMARY_MODEL
+    assert request["body"]["messages"][-1] == {"role": "user", "content": TEXT}
+    assert submitted["results"][2]["summary"] == "짧은 제목"
+
+    job_id = submitted["job_id"]
+    fake_batches["batch"] = SimpleNamespace(status="in_progress", output_file_id=None, error_file_id=None)
+    assert asyncio.run(main.get_batch_job(job_id)) == {"job_id": job_id, "status": "in_progress"}
+
+    fake_batches["batch"] = SimpleNamespace(status="completed", output_file_id="file-out", error_file_id=None)
+    fake_batches["output"] = main.orjson.dumps({
+        "custom_id": request["custom_id"],
+        "response": {"body": {"choices": [{"message": {"content": "3분기 매출이 12% 증가함."}}]}},
+    }) + b"\n"
+    completed = asyncio.run(main.get_batch_job(job_id))
+
+    assert completed["status"] == "completed"
+    assert [result.get("summary") for result in completed["results"]] == [
+        "3분기 매출이 12% 증가함.", "3분기 매출이 12% 증가함.", "짧은 제목", None
+    ]
+    assert all("custom_id" not in result for result in completed["results"])
+
+
+# 모든 요청이 실패해 출력 파일 없이 완료된 배치는 오류 파일 ID와 함께 실패로 반환해야 함
+def test_batch_without_output_file_is_failed(jobs, fake_batches):
+    job_id = asyncio.run(main.submit_batch_job([{"filename": "a.png", "text": TEXT}]))["job_id"]
+    fake_batches["batch"] = SimpleNamespace(status="completed", output_file_id=None, error_file_id="file-err")
+
+    assert asyncio.run(main.get_batch_job(job_id)) == {"job_id": job_id, "status": "failed", "error_file_id": "file-err"}
+
+
+# 요약할 텍스트가 없으면 배치를 제출하지 않고 결과만 반환해야 함
+def test_batch_with_nothing_to_summarize_is_not_submitted(jobs, fake_batches):
+    results = [{"filename": "a.png", "text": "짧은 제목"}]
+
+    assert asyncio.run(main.submit_batch_job(results)) == {"results": [{"filename": "a.png", "text": "짧은 제목", "summary": "짧은 제목"}]}
+    assert fake_batches["submitted"] == [] and jobs == {}
+
+
+def test_unknown_batch_job_is_not_found(jobs):
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(main.get_batch_job("missing"))
+
+    assert error.value.status_code == 404
@@ -0,0 +1,71 @@
+import asyncio
+import base64
+import io
+import os
+import tempfile
+
+import pytest
+from botocore.stub import Stubber
+from PIL import Image
+from starlette.datastructures import Headers, UploadFile
+
+import main
+
+
+# 테스트용 PNG 바이트 생성
+def make_png(size=(8, 8)) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, (255, 255, 255)).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+# Starlette처럼 임시 파일에 저장된 업로드 파일 생성
+def make_upload(content: bytes, filename: str, content_type: str) -> UploadFile:
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    spooled.write(content)
+    spooled.seek(0)
+    return UploadFile(
+        spooled,
+        size=len(content),
+        filename=filename,
+        headers=Headers({"content-type": content_type}),
+    )
+
+
+@pytest.fixture
+def s3_stub():
+    with Stubber(main.s3_client) as stubber:
+        yield stubber
+        stubber.assert_no_pending_responses()
+
+
+# inline=true 응답의 image_data가 S3에 업로드한 원본 바이트와 같아야 함
+# (upload_fileobj가 업로드 후 파일을 닫아도 다시 읽을 수 있어야 함)
+def test_inline_image_data_survives_s3_upload(s3_stub):
+    content = make_png()
+    upload = make_upload(content, "page.png", "image/png")
+    s3_stub.add_response("put_object", {"ETag": '"etag"'})
+
+    # 같은 이미지의 OCR 결과가 캐시에 있으면 Tesseract 없이 원본을 그대로 업로드
+    content_hash = main.hashlib.blake2b(content, digest_size=16).hexdigest()
+    main.lru_set(main.ocr_cache, main.ocr_cache_key(content_hash), "캐시된 텍스트", main.OCR_CACHE_SIZE)
+
+    async def run():
+        return await main._process_one(upload, asyncio.Semaphore(1), summarize=False, inline=True)
+
+    result = asyncio.run(run())
+
+    assert result["text"] == "캐시된 텍스트"
+    assert base64.b64decode(result["image_data"]) == content
+
+
+# 여러 청크에 걸친 파일도 S3 업로드 후 청크 단위 base64 인코딩 결과가 원본과 같아야 함
+def test_chunked_base64_after_upload(s3_stub):
+    content = os.urandom(main.B64_CHUNK_SIZE * 2 + 1)
+    buffer = io.BytesIO(content)
+    s3_stub.add_response("put_object", {"ETag": '"etag"'})
+
+    asyncio.run(main.upload_to_s3(buffer, "0f8fad5b-d9cb-469f-a165-70867728950e.jpg"))
+
+    assert not buffer.closed
+    assert main.b64encode_file(buffer) == base64.b64encode(content).decode("ascii")
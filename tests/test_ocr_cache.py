@@ -0,0 +1,141 @@
+import asyncio
+import io
+import tempfile
+import threading
+
+import pytest
+from botocore.stub import Stubber
+from PIL import Image
+from starlette.datastructures import Headers, UploadFile
+
+import main
+
+
+# 업로드마다 다른 내용이 되도록 색을 지정한 테스트용 PNG 생성
+def make_png(color) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (8, 8), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def make_upload(content: bytes, filename: str) -> UploadFile:
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    spooled.write(content)
+    spooled.seek(0)
+    return UploadFile(spooled, size=len(content), filename=filename, headers=Headers({"content-type": "image/png"}))
+
+
+@pytest.fixture
+def s3_stub():
+    with Stubber(main.s3_client) as stubber:
+        yield stubber
+        stubber.assert_no_pending_responses()
+
+
+@pytest.fixture
+def fake_ocr(monkeypatch):
+    calls = []
+
+    def perform_ocr(image):
+        calls.append(image.size)
+        return "인식된 텍스트"
+
+    monkeypatch.setattr(main, "perform_ocr", perform_ocr)
+    return calls
+
+
+# 캐시 미스: S3 캐시 조회는 CPU 슬롯 밖에서 하고, S3 캐시 저장은 응답을 기다리게 하지 않아야 함
+def test_cache_miss_reads_s3_outside_cpu_slot_and_writes_in_background(s3_stub, fake_ocr, monkeypatch):
+    cpu_slots = asyncio.Semaphore(1)
+    slot_held_during_read = []
+    read_text_cache_from_s3 = main.read_text_cache_from_s3
+
+    def read_cache(prefix, cache_key):
+        slot_held_during_read.append(cpu_slots.locked())
+        return read_text_cache_from_s3(prefix, cache_key)
+
+    write_started = threading.Event()
+    release_write = threading.Event()
+    written = []
+
+    def write_cache(prefix, cache_key, text):
+        write_started.set()
+        release_write.wait(5)
+        written.append((prefix, cache_key, text))
+
+    monkeypatch.setattr(main, "read_text_cache_from_s3", read_cache)
+    monkeypatch.setattr(main, "write_text_cache_to_s3", write_cache)
+    s3_stub.add_client_error("get_object", service_error_code="NoSuchKey", http_status_code=404)
+    s3_stub.add_response("put_object", {"ETag": '"etag"'})
+    content = make_png((10, 20, 30))
+
+    async def run():
+        result = await main._process_one(make_upload(content, "page.png"), cpu_slots, summarize=False)
+        # 응답은 S3 캐시 저장이 끝나기 전에 만들어짐
+        assert not written
+        release_write.set()
+        await asyncio.gather(*main.cache_write_tasks)
+        return result
+
+    result = asyncio.run(run())
+
+    assert result["text"] == "인식된 텍스트"
+    assert slot_held_during_read == [False]
+    assert write_started.is_set()
+    assert fake_ocr == [(8, 8)]
+    cache_key = main.ocr_cache_key(main.hashlib.blake2b(content, digest_size=16).hexdigest())
+    assert written == [(main.OCR_CACHE_PREFIX, cache_key, "인식된 텍스트")]
+    assert main.lru_get(main.ocr_cache, cache_key) == "인식된 텍스트"
+
+
+# 동시에 들어온 같은 이미지는 OCR을 한 번만 실행해야 함
+def test_concurrent_duplicates_share_one_ocr_run(fake_ocr, monkeypatch):
+    monkeypatch.setattr(main, "read_text_cache_from_s3", lambda prefix, cache_key: None)
+    monkeypatch.setattr(main, "write_text_cache_to_s3", lambda prefix, cache_key, text: None)
+    image = Image.new("L", (8, 8), 255)
+
+    async def run():
+        return await asyncio.gather(
+            main.ocr_with_cache("same-hash-for-in-flight-test", image),
+            main.ocr_with_cache("same-hash-for-in-flight-test", image),
+        )
+
+    assert asyncio.run(run()) == ["인식된 텍스트", "인식된 텍스트"]
+    assert fake_ocr == [(8, 8)]
+
+
+# S3 캐시 저장이 예상하지 못한 예외로 실패해도 로그만 남기고 전파하지 않아야 함
+def test_background_cache_write_failure_is_logged(monkeypatch):
+    def write_cache(prefix, cache_key, text):
+        raise RuntimeError("boom")
+
+    logged = []
+    monkeypatch.setattr(main, "write_text_cache_to_s3", write_cache)
+    monkeypatch.setattr(main, "log_error", lambda message, error=None, **kwargs: logged.append((message, error)))
+
+    async def run():
+        main.store_text_cache_in_background(main.OCR_CACHE_PREFIX, "key", "text")
+        await asyncio.gather(*main.cache_write_tasks, return_exceptions=True)
+        await asyncio.sleep(0)
+
+    asyncio.run(run())
+
+    assert [(message, str(error)) for message, error in logged] == [("S3 캐시 저장 실패", "boom")]
+    assert not main.cache_write_tasks
+
+
+# S3 서버 오류는 캐시 조회 미스로 처리되어야 함 (OCR 자체가 실패하지 않도록)
+def test_s3_server_error_is_a_cache_miss(s3_stub):
+    s3_stub.add_client_error("get_object", service_error_code="InternalError", http_status_code=500)
+
+    assert main.read_text_cache_from_s3(main.OCR_CACHE_PREFIX, "key") is None
+
+
+# S3에 연결할 수 없는 경우(BotoCoreError)도 캐시 조회 미스로 처리되어야 함
+def test_s3_endpoint_error_is_a_cache_miss(monkeypatch):
+    def get_object(**kwargs):
+        raise main.BotoCoreError()
+
+    monkeypatch.setattr(main.s3_client, "get_object", get_object)
+
+    assert main.read_text_cache_from_s3(main.OCR_CACHE_PREFIX, "key") is None
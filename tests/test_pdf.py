@@ -0,0 +1,64 @@
+import base64
+import os
+import re
+import zlib
+
+import pytest
+import reportlab
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+
+import main
+
+
+# 한글 폰트를 등록하지 못한 환경에서는 ReportLab에 포함된 TrueType 폰트를 같은 이름으로 등록해 사용
+# (테스트는 글리프가 아니라 페이지마다 어떤 글꼴이 쓰이는지만 확인)
+@pytest.fixture
+def korean_font():
+    if "NanumGothic" not in pdfmetrics.getRegisteredFontNames():
+        fallback = os.path.join(os.path.dirname(reportlab.__file__), "fonts", "Vera.ttf")
+        pdfmetrics.registerFont(TTFont("NanumGothic", fallback))
+    return bytes(pdfmetrics.getFont("NanumGothic").face.name)
+
+
+# 페이지 콘텐츠 스트림(ASCII85 + Flate)에서 글자를 그린 글꼴의 BaseFont 이름 집합 반환 (페이지별)
+def fonts_per_page(pdf: bytes):
+    base_fonts = {
+        name: re.search(rb"\n%s 0 obj\n.*?/BaseFont /(\S+)" % number, pdf, re.S).group(1)
+        for name, number in re.findall(rb"/(F[\w+]+) (\d+) 0 R", pdf)
+    }
+    pages = []
+    for stream in re.findall(rb"/Filter \[ /ASCII85Decode /FlateDecode \][^>]*>>\s*stream\r?\n(.*?)endstream", pdf, re.S):
+        content = zlib.decompress(base64.a85decode(stream.strip(), adobe=True))
+        # 페이지 머리말의 기본 글꼴 설정(Helvetica)은 제외하고 실제로 글자를 그릴 때(Tj/TJ)의 글꼴만 수집
+        fonts, current = set(), None
+        for match in re.finditer(rb"/(F[\w+]+) [\d.]+ Tf|\) Tj|\] TJ", content):
+            if match.group(1):
+                current = base_fonts[match.group(1)]
+            else:
+                fonts.add(current)
+        pages.append(fonts)
+    return pages
+
+
+def build(tmp_path, results) -> bytes:
+    path = tmp_path / "out.pdf"
+    main.build_pdf(results, [None] * len(results), str(path))
+    return path.read_bytes()
+
+
+# 여러 결과와 페이지 넘김이 있어도 모든 페이지가 한글 글꼴만 사용해야 함
+# (showPage() 후 글꼴이 Helvetica로 돌아가면 두 번째 결과부터 "요약:", "원문:"의 한글이 깨짐)
+def test_multi_page_pdf_uses_korean_font_on_every_page(tmp_path, korean_font):
+    long_text = "\n".join(f"{i}번째 줄의 원문 텍스트" for i in range(60))
+    results = [
+        {"summary": "첫 번째 문서 요약", "text": long_text, "image": None},
+        {"summary": "두 번째 문서 요약", "text": "짧은 원문", "image": None},
+    ]
+
+    pdf = build(tmp_path, results)
+
+    pages = fonts_per_page(pdf)
+    assert len(pages) >= 3
+    # 글꼴 이름 앞에는 서브셋 접두사(AAAAAA+)가 붙음
+    assert all(fonts and all(font.endswith(korean_font) for font in fonts) for fonts in pages), pages
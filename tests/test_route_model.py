@@ -0,0 +1,26 @@
+import main
+
+
+# 공백을 제외한 40자 미만의 텍스트는 OpenAI를 호출하지 않고 로컬에서 정리만 수행
+def test_very_short_text_is_summarized_locally():
+    assert main.route_model("회 의 록  2024. 6. 7") == ("local", None, None)
+
+
+# 짧은 텍스트와 기본 설정의 긴 텍스트는 서로 다른 모델로 라우팅되어야 함
+def test_short_and_long_texts_use_different_models_by_default():
+    short_text = "회의는 다음 주 월요일 오전 10시에 본관 3층 대회의실에서 열리며 참석자는 안건 자료를 검토해 주시기 바랍니다."
+    long_text = " ".join(["분기 매출은 전년 대비 증가했고 영업이익은 신규 투자로 감소했다."] * 40)
+
+    short_route = main.route_model(short_text)
+    long_route = main.route_model(long_text)
+
+    assert short_route == ("openai", main.SUMMARY_MODEL_SMALL, main.SMALL_SUMMARY_MAX_TOKENS)
+    assert long_route == ("openai", main.SUMMARY_MODEL, main.SUMMARY_MAX_TOKENS)
+    assert short_route[1] != long_route[1]
+
+
+# 기호나 공백 비율이 높은 텍스트(표, 깨진 OCR 결과)는 길어도 작은 모델 사용
+def test_low_density_text_uses_small_model():
+    table = " ".join(["| -- | -- | 12 |"] * 250)
+
+    assert main.route_model(table)[1] == main.SUMMARY_MODEL_SMALL
@@ -0,0 +1,81 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import main
+
+# 로컬 요약 기준(40자)보다 길어 OpenAI 요약 대상이 되는 텍스트
+TEXT = "분기 실적 보고서입니다. 3분기 매출은 전년 동기 대비 12% 증가한 1,250억 원이며, 영업이익은 신규 사업 투자로 소폭 감소했습니다."
+
+
+@pytest.fixture
+def fake_openai(monkeypatch):
+    calls = []
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="3분기 매출이 12% 늘어 1,250억 원을 기록함."))],
+            usage=SimpleNamespace(prompt_tokens=1500, prompt_tokens_details=SimpleNamespace(cached_tokens=1280)),
+        )
+
+    monkeypatch.setattr(main.openai_client.chat.completions, "create", create)
+    monkeypatch.setattr(main, "read_text_cache_from_s3", lambda prefix, cache_key: None)
+    main.summary_cache.clear()
+    return calls
+
+
+# 요청 처리 중의 요약은 S3 캐시 저장을 기다리지 않고 반환되어야 함
+def test_summary_returns_before_s3_cache_write(fake_openai, monkeypatch):
+    release_write = threading.Event()
+    written = []
+
+    def write_cache(prefix, cache_key, text):
+        release_write.wait(5)
+        written.append((prefix, cache_key, text))
+
+    monkeypatch.setattr(main, "write_text_cache_to_s3", write_cache)
+
+    async def run():
+        summary = await main.generate_summary(TEXT)
+        assert not written
+        release_write.set()
+        await asyncio.gather(*main.cache_write_tasks)
+        return summary
+
+    summary = asyncio.run(run())
+
+    cache_key = main.summary_cache_key(main.route_model(TEXT)[1], TEXT)
+    assert written == [(main.SUMMARY_CACHE_PREFIX, cache_key, summary)]
+    assert len(fake_openai) == 1
+
+
+# 요약 캐시는 공백만 다른 OCR 결과에도 적중해야 함 (정확한 일치 캐시)
+def test_summary_cache_ignores_whitespace_differences(fake_openai, monkeypatch):
+    monkeypatch.setattr(main, "write_text_cache_to_s3", lambda prefix, cache_key, text: None)
+
+    async def run():
+        first = await main.generate_summary(TEXT)
+        second = await main.generate_summary(TEXT.replace(" ", "\n  "))
+        await asyncio.gather(*main.cache_write_tasks)
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first == second
+    assert len(fake_openai) == 1
+
+
+# 요약 워커는 S3 저장이 실패하면 메시지를 다시 시도하도록 실패를 보고해야 함
+def test_worker_waits_for_s3_write_and_reports_failure(fake_openai, monkeypatch):
+    def write_cache(prefix, cache_key, text):
+        raise RuntimeError("S3 unavailable")
+
+    monkeypatch.setattr(main, "write_text_cache_to_s3", write_cache)
+    records = [{"messageId": "m1", "body": main.orjson.dumps({"text": TEXT}).decode()}]
+
+    response = asyncio.run(main.process_summary_messages(records))
+
+    assert response == {"batchItemFailures": [{"itemIdentifier": "m1"}]}
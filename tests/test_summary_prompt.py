@@ -0,0 +1,17 @@
+import pytest
+
+import main
+
+# OpenAI 자동 프롬프트 캐싱은 1024 토큰 이상의 동일한 접두부에서만 동작하므로 여유를 두고 확인
+MIN_PREFIX_TOKENS = 1200
+
+
+# 요약 시스템 프롬프트는 gpt-4o 계열 모델의 토크나이저(o200k_base) 기준으로 캐싱 최소 길이를 넘어야 함
+def test_summary_system_prompt_is_long_enough_for_prompt_caching():
+    tiktoken = pytest.importorskip("tiktoken")
+    try:
+        encoding = tiktoken.get_encoding("o200k_base")
+    except Exception as e:  # 인코딩 파일은 처음 사용할 때 내려받으므로 오프라인 환경에서는 건너뜀
+        pytest.skip(f"o200k_base 인코딩을 불러올 수 없음: {e}")
+
+    assert len(encoding.encode(main.KOREAN_SUMMARY_SYSTEM)) >= MIN_PREFIX_TOKENS
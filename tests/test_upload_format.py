@@ -0,0 +1,132 @@
+import asyncio
+import io
+import tempfile
+
+import pytest
+from PIL import Image
+from starlette.datastructures import Headers, UploadFile
+
+import main
+
+
+def encode(image: Image.Image, format: str) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format=format)
+    return buffer.getvalue()
+
+
+def make_upload(content: bytes, filename: str, content_type: str = "application/octet-stream") -> UploadFile:
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    spooled.write(content)
+    spooled.seek(0)
+    return UploadFile(spooled, size=len(content), filename=filename, headers=Headers({"content-type": content_type}))
+
+
+# S3 업로드를 기록하는 가짜 upload_fileobj (키, Content-Type, 업로드된 바이트)
+@pytest.fixture
+def uploads(monkeypatch):
+    recorded = []
+
+    def upload_fileobj(file_obj, bucket, key, ExtraArgs=None, Config=None):
+        recorded.append({"key": key, "content_type": ExtraArgs["ContentType"], "body": file_obj.read()})
+
+    monkeypatch.setattr(main.s3_client, "upload_fileobj", upload_fileobj)
+    monkeypatch.setattr(main, "perform_ocr", lambda image: "인식된 텍스트")
+    monkeypatch.setattr(main, "read_text_cache_from_s3", lambda prefix, cache_key: None)
+    monkeypatch.setattr(main, "write_text_cache_to_s3", lambda prefix, cache_key, text: None)
+    return recorded
+
+
+def process(upload: UploadFile) -> dict:
+    async def run():
+        result = await main._process_one(upload, asyncio.Semaphore(1), summarize=False)
+        await asyncio.gather(*main.cache_write_tasks)
+        return result
+
+    return asyncio.run(run())
+
+
+# 확장자가 없는 PNG도 디코딩한 형식으로 .png 키와 image/png로 저장되어 /api/image로 조회할 수 있어야 함
+def test_passthrough_png_without_extension_uses_decoded_format(uploads):
+    content = encode(Image.new("RGB", (16, 16), (1, 2, 3)), "PNG")
+
+    result = process(make_upload(content, "noext"))
+
+    [upload] = uploads
+    assert main.UPLOAD_KEY_PATTERN.fullmatch(upload["key"]).group(1) == ".png"
+    assert upload["content_type"] == "image/png"
+    assert upload["body"] == content
+    assert result["content_type"] == "image/png"
+
+
+# 클라이언트 파일 이름의 확장자가 실제 형식과 달라도 디코딩한 형식을 따라야 함
+def test_passthrough_uses_decoded_format_over_filename(uploads):
+    content = encode(Image.new("RGB", (16, 16), (4, 5, 6)), "JPEG")
+
+    result = process(make_upload(content, "scan.png", "image/png"))
+
+    [upload] = uploads
+    assert upload["key"].endswith(".jpg")
+    assert upload["content_type"] == "image/jpeg"
+    assert result["content_type"] == "image/jpeg"
+
+
+# 재인코딩되는 GIF는 JPEG로 저장되고 응답도 저장된 형식(image/jpeg)을 알려야 함
+def test_reencoded_gif_reports_stored_jpeg_type(uploads):
+    content = encode(Image.new("P", (16, 16), 3), "GIF")
+
+    result = process(make_upload(content, "anim.gif", "image/gif"))
+
+    [upload] = uploads
+    assert upload["key"].endswith(".jpg")
+    assert upload["content_type"] == "image/jpeg"
+    assert Image.open(io.BytesIO(upload["body"])).format == "JPEG"
+    assert result["content_type"] == "image/jpeg"
+
+
+# 미리보기 최대 크기를 넘는 JPEG는 원본이 아니라 축소해 재인코딩한 이미지를 저장해야 함
+def test_oversized_jpeg_is_reencoded(uploads):
+    width = main.PREVIEW_MAX_SIZE[0] + 100
+    content = encode(Image.new("RGB", (width, 100), (7, 8, 9)), "JPEG")
+
+    process(make_upload(content, "wide.jpg", "image/jpeg"))
+
+    [upload] = uploads
+    assert upload["body"] != content
+    assert Image.open(io.BytesIO(upload["body"])).size[0] == main.PREVIEW_MAX_SIZE[0]
+
+
+# 같은 내용의 파일은 한 요청에 함께 올라와도, 다음 요청에 다시 올라와도 S3에 한 번만 업로드해야 함
+def test_duplicate_uploads_reuse_the_first_s3_object(uploads):
+    content = encode(Image.new("RGB", (16, 16), (10, 11, 12)), "PNG")
+
+    async def run():
+        cpu_slots = asyncio.Semaphore(2)
+        first = await asyncio.gather(
+            main._process_one(make_upload(content, "b.png"), cpu_slots, summarize=False),
+            main._process_one(make_upload(content, "c.png"), cpu_slots, summarize=False),
+        )
+        again = await main._process_one(make_upload(content, "d.png"), cpu_slots, summarize=False)
+        await asyncio.gather(*main.cache_write_tasks)
+        return first + [again]
+
+    results = asyncio.run(run())
+
+    [upload] = uploads
+    content_hash = main.hashlib.blake2b(content, digest_size=16).hexdigest()
+    assert upload["key"] == main.upload_key(content_hash, ".png")
+    assert len({result["image"] for result in results}) == 1
+    assert [result["content_type"] for result in results] == ["image/png"] * 3
+
+
+# 재사용 기간이 지나면 같은 키로 다시 업로드해야 함 (버킷 수명 주기 규칙으로 삭제된 객체를 가리키지 않도록)
+def test_expired_upload_cache_uploads_again_under_the_same_key(uploads):
+    content = encode(Image.new("RGB", (16, 16), (13, 14, 15)), "PNG")
+    process(make_upload(content, "first.png"))
+    content_hash = main.hashlib.blake2b(content, digest_size=16).hexdigest()
+    started, ext, task = main.upload_cache[content_hash]
+    main.upload_cache[content_hash] = (started - main.UPLOAD_CACHE_TTL, ext, task)
+
+    process(make_upload(content, "second.png"))
+
+    assert [upload["key"] for upload in uploads] == [main.upload_key(content_hash, ".png")] * 2